@@ -1,9 +1,4 @@
-import sys
 import os
-import cv2
-import numpy as np
-from PIL import Image
-from scipy.signal import convolve2d
 
 # Import all your individual routine functions
 from ImageFileAtrb import get_image_statistics
@@ -22,10 +17,8 @@ from DynamRang import calculate_dynamic_range
 from FFTSharp import fft_sharpness_score
 from GabVarQC import gabor_variance
 from GradMetric import gradient_metric
-from LaplacianFilter import calculate_laplacian_metric
-from LaplacianSharp import analyze_laplacian_sharpness
 from LocalVar import local_variance_sharpness
-from NoiseGrain import calculate_noise_metric
+from FullMetricList import calculate_noise_metric
 from NormAvGrad import normalized_average_gradient
 from SobelEIS import sobel_eis_sharpness
 from TenengradQC import tenengrad_focus_measure
@@ -51,6 +44,8 @@ def run_all_analyses(image_path):
 
     # --- 2. Sharpness and Focus ---
     print("\n--- Sharpness and Focus ---")
+    # LaplacianFilter and LaPlacianSharp compute this same Laplacian variance, so
+    # it is only run (and the image only decoded for it) once
     print("Running analyze_sharpness (Laplacian Variance)...")
     analyze_sharpness(image_path)
     
@@ -84,12 +79,6 @@ def run_all_analyses(image_path):
     print("\nRunning sobel_eis_sharpness...")
     sobel_eis_sharpness(image_path)
     
-    print("\nRunning LaplacianFilter...")
-    calculate_laplacian_metric(image_path)
-    
-    print("\nRunning LaplacianSharp...")
-    analyze_laplacian_sharpness(image_path)
-    
     # --- 3. Color and Tonal Analysis ---
     print("\n--- Color and Tonal Analysis ---")
     print("Running analyze_tonal_distribution...")
@@ -107,7 +96,8 @@ def run_all_analyses(image_path):
     analyze_noise(image_path)
     
     print("\nRunning calculate_noise_metric...")
-    calculate_noise_metric(image_path)
+    # Returns the score rather than printing it
+    print(f"Noise Metric (MSE vs. median-filtered): {calculate_noise_metric(image_path):.2f}")
 
     print("\nRunning run_blind_deconvolution...")
     run_blind_deconvolution(image_path)
@@ -133,6 +123,7 @@ def run_all_analyses(image_path):
 if __name__ == "__main__":
     try:
         image_file = os.path.join("QCImages", "QCRef.jpg")
-        run_all_analyses(image_file)    except (FileNotFoundError, ValueError) as e:
+        run_all_analyses(image_file)
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
\ No newline at end of file
@@ -3,6 +3,18 @@ import numpy as np
 import os
 from image_utils import get_qc_image_path
 
+# Optional ahead-of-time compiled kernel, built from _brenner_pythran.py with Pythran
+try:
+    from _brenner_ext import brenner as _brenner_ext
+except ImportError:
+    _brenner_ext = None
+
+# Otherwise the Numba kernel from qc_kernels; without Numba, cv2.norm below
+try:
+    from qc_kernels import brenner_sum as _brenner_kernel
+except ImportError:
+    _brenner_kernel = None
+
 def calculate_brenner_sharpness(image_path):
     """
     Calculates image sharpness using the Brenner gradient method.
@@ -25,10 +37,29 @@ def calculate_brenner_sharpness(image_path):
     if image is None:
         raise ValueError("Error: Could not load the image. Check file integrity.")
 
-    # Shift image by 2 pixels vertically and compute squared difference
-    shifted = np.roll(image, -2, axis=0)
-    diff = image[:-2, :] - shifted[:-2, :]
-    brenner_metric = np.sum(diff ** 2)
+    return calculate_brenner_sharpness_arr(image)
+
+def calculate_brenner_sharpness_arr(image):
+    """
+    Calculates the Brenner sharpness score of an already-decoded grayscale image.
+
+    Parameters:
+        image (ndarray): uint8 grayscale image.
+
+    Returns:
+        float: Brenner sharpness score.
+    """
+    if _brenner_ext is not None:
+        # The compiled kernel only accepts C-contiguous arrays
+        return int(_brenner_ext(np.ascontiguousarray(image)))
+
+    if _brenner_kernel is not None:
+        return int(_brenner_kernel(image))
+
+    # Sum of squared differences between pixels 2 rows apart. The two-array form of
+    # cv2.norm differences, squares and sums in one pass, without a diff image and
+    # without uint8 wrap-around
+    brenner_metric = int(cv2.norm(image[:-2, :], image[2:, :], cv2.NORM_L2SQR))
 
     return brenner_metric
 
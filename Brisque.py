@@ -1,38 +1,54 @@
-import numpy as np
-from PIL import Image
+import cv2
 from brisque import BRISQUE
 from image_utils import get_qc_image_path
 
+# Shared BRISQUE scorer, created on first use so the model is only loaded once
+_SCORER = None
+
+def _get_scorer():
+    """Returns the module-level BRISQUE scorer, creating it on first call."""
+    global _SCORER
+    if _SCORER is None:
+        _SCORER = BRISQUE(url=False)
+    return _SCORER
+
 def calculate_brisque_score(image_path):
     """
     Calculates the BRISQUE (Blind/Referenceless Image Spatial Quality Evaluator) score for a given image.
     Lower scores indicate better perceptual quality (less distortion or blur).
     """
     try:
-        # Load image and convert to RGB format
-        img = Image.open(image_path).convert("RGB")
+        # Load image with OpenCV (libjpeg-turbo decode) and convert BGR to RGB
+        bgr = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise FileNotFoundError(f"File not found or unable to read: {image_path}")
+        img_array = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
 
-        # Convert image to NumPy array for processing
-        img_array = np.asarray(img)
+        return calculate_brisque_score_arr(img_array)
 
-        # Initialize BRISQUE scorer (no URL model used)
-        scorer = BRISQUE(url=False)
+    except Exception as e:
+        print(f"❌ Error calculating BRISQUE score: {e}")
+        return None
 
-        # Compute BRISQUE score
-        score = scorer.score(img_array)
+def calculate_brisque_score_arr(img_array):
+    """
+    Calculates the BRISQUE score of an already-decoded RGB image.
+    Lower scores indicate better perceptual quality (less distortion or blur).
+    """
+    # Get the shared BRISQUE scorer (no URL model used)
+    scorer = _get_scorer()
 
-        # Output section: print score and interpretation
-        print(f"📉 BRISQUE Score: {score:.2f}")
-        print("🔍 Interpretation:")
-        print(" - Lower score = higher perceptual quality (sharper, less distorted)")
-        print(" - Higher score = lower quality (more blur, noise, or artifacts)")
-        print(" - Use scores to compare relative quality across images")
+    # Compute BRISQUE score
+    score = scorer.score(img_array)
 
-        return score
+    # Output section: print score and interpretation
+    print(f"📉 BRISQUE Score: {score:.2f}")
+    print("🔍 Interpretation:")
+    print(" - Lower score = higher perceptual quality (sharper, less distorted)")
+    print(" - Higher score = lower quality (more blur, noise, or artifacts)")
+    print(" - Use scores to compare relative quality across images")
 
-    except Exception as e:
-        print(f"❌ Error calculating BRISQUE score: {e}")
-        return None
+    return score
 
 if __name__ == "__main__":
     try:
@@ -1,7 +1,63 @@
 import cv2
 import numpy as np
+from scipy import fft as sp_fft
 from image_utils import get_qc_image_path
 
+def _estimate_channel_shifts(channels, reference, mask, max_shift):
+    """
+    Estimates the horizontal shifts that best align each channel to the reference channel,
+    using FFT cross-correlation of the masked rows and a parabolic sub-pixel peak fit.
+    All channels are transformed in one batched FFT against a single reference spectrum.
+
+    Parameters:
+        channels (list of ndarray): Channels to align (e.g. red and blue).
+        reference (ndarray): Reference channel (green).
+        mask (ndarray): Boolean mask of the pixels to compare.
+        max_shift (int): Largest shift (in pixels) to consider in either direction.
+
+    Returns:
+        list of float: Sub-pixel shift to apply to each channel, in the np.roll sense.
+    """
+    # Only rows that contain masked pixels contribute to the correlation
+    rows = mask.any(axis=1)
+
+    # Correlate horizontal gradients rather than raw intensities: edges become
+    # sharp peaks, which gives a well-defined correlation maximum
+    channels = np.stack([cv2.Sobel(channel[rows], cv2.CV_32F, 1, 0, ksize=3) for channel in channels])
+    reference = cv2.Sobel(reference[rows], cv2.CV_32F, 1, 0, ksize=3)
+
+    # Mask only the reference, widened by the search range so each edge's full
+    # gradient profile is kept and the shifted channel can slide under it
+    window = cv2.dilate(mask[rows].astype(np.uint8), np.ones((1, 2 * max_shift + 1), np.uint8))
+    reference *= window
+
+    # Zero-pad so circular correlation doesn't wrap within the search range
+    n = sp_fft.next_fast_len(reference.shape[1] + max_shift, real=True)
+    channels_fft = sp_fft.rfft(channels, n, axis=-1, workers=-1)
+    reference_fft = sp_fft.rfft(reference, n, axis=-1, workers=-1)
+
+    # Summing the cross-spectra over rows first means only one inverse FFT per channel
+    cross_spectra = (channels_fft * np.conj(reference_fft)).sum(axis=1)
+    xcs = sp_fft.irfft(cross_spectra, n, axis=-1)
+
+    # Correlation at lags -max_shift..+max_shift
+    lags = np.arange(-max_shift, max_shift + 1)
+    shifts = []
+    for xc in xcs[:, lags % n]:
+        k = int(np.argmax(xc))
+
+        # Parabolic fit through the peak and its neighbours for sub-pixel accuracy
+        delta = 0.0
+        if 0 < k < len(xc) - 1:
+            denominator = xc[k - 1] - 2 * xc[k] + xc[k + 1]
+            if denominator != 0:
+                delta = 0.5 * (xc[k - 1] - xc[k + 1]) / denominator
+
+        # A positive lag means the channel sits to the right, so it must be shifted back
+        shifts.append(float(-(lags[k] + delta)))
+
+    return shifts
+
 def analyze_chromatic_aberration(image_path):
     """
     Analyzes chromatic aberration (color fringing) in an image by measuring misalignment
@@ -23,66 +79,69 @@ def analyze_chromatic_aberration(image_path):
             raise FileNotFoundError(f"File not found or unable to read: {image_path}")
 
         print(f"✅ Successfully loaded image: {image_path}")
-        print("\n--- Chromatic Aberration Analysis ---")
-
-        # Convert to grayscale for edge detection
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        # Detect edges using Canny to focus on high-contrast areas
-        cv2.Canny(gray, 100, 200)
-
-        # Split image into Blue, Green, Red channels
-        b, g, r = cv2.split(img)
-
-        # Initialize variables to track best alignment shifts
-        best_r_shift = 0
-        best_b_shift = 0
-        min_r_diff = np.inf
-        min_b_diff = np.inf
-
-        # Search for optimal horizontal shift (-5 to +5 pixels)
-        for shift in range(-5, 6):
-            # Shift red channel and compare to green
-            shifted_r = np.roll(r, shift, axis=1)
-            diff_r = np.sum(np.abs(shifted_r - g))
-            if diff_r < min_r_diff:
-                min_r_diff = diff_r
-                best_r_shift = shift
-
-            # Shift blue channel and compare to green
-            shifted_b = np.roll(b, shift, axis=1)
-            diff_b = np.sum(np.abs(shifted_b - g))
-            if diff_b < min_b_diff:
-                min_b_diff = diff_b
-                best_b_shift = shift
-
-        # Normalize shifts by image width to get percentage score
-        width = img.shape[1]
-        score_r = abs(best_r_shift) / width * 100
-        score_b = abs(best_b_shift) / width * 100
-        overall_score = (score_r + score_b) / 2
-
-        # --- Output Section ---
-        print(f"🔴 Red Channel Shift (pixels): {best_r_shift}")
-        print(f"🔵 Blue Channel Shift (pixels): {best_b_shift}")
-        print(f"📊 Overall Chromatic Aberration Score: {overall_score:.4f}%")
-
-        # --- Interpretation ---
-        print("🔍 Interpretation:")
-        if overall_score < 0.01:
-            print(" - Very low chromatic aberration. Excellent lens performance.")
-        elif overall_score < 0.05:
-            print(" - Minor chromatic aberration detected. Generally not visible.")
-        else:
-            print(" - Significant chromatic aberration detected. Fringing may be noticeable.")
-
-        return overall_score
+        return analyze_chromatic_aberration_arr(img)
 
     except FileNotFoundError:
         print(f"❌ Error: The file '{image_path}' was not found. Please ensure it is located at '{image_path}'.")
     except Exception as e:
         print(f"❌ An error occurred: {e}")
 
+def analyze_chromatic_aberration_arr(img, gray=None):
+    """
+    Chromatic aberration analysis of an already-decoded BGR image.
+
+    Parameters:
+        img (ndarray): uint8 BGR image.
+        gray (ndarray): Optional precomputed grayscale version of img.
+
+    Returns:
+        float: Overall chromatic aberration score as a percentage of image width.
+    """
+    print("\n--- Chromatic Aberration Analysis ---")
+
+    # Convert to grayscale for edge detection
+    if gray is None:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # Detect edges using Canny to focus on high-contrast areas
+    edges = cv2.Canny(gray, 100, 200)
+
+    # Fringing only shows up around edges, so compare channels there only.
+    # Dilate slightly so the search window covers both sides of each edge.
+    mask = cv2.dilate(edges, np.ones((3, 3), np.uint8)) > 0
+    if not mask.any():
+        # No edges found: fall back to comparing every pixel
+        mask[:] = True
+
+    # Split image into Blue, Green, Red channels
+    b, g, r = cv2.split(img)
+
+    # Find the horizontal shift (-5 to +5 pixels) aligning red and blue to green
+    max_shift = 5
+    width = img.shape[1]
+    best_r_shift, best_b_shift = _estimate_channel_shifts([r, b], g, mask, max_shift)
+
+    # Normalize shifts by image width to get percentage score
+    score_r = abs(best_r_shift) / width * 100
+    score_b = abs(best_b_shift) / width * 100
+    overall_score = (score_r + score_b) / 2
+
+    # --- Output Section ---
+    print(f"🔴 Red Channel Shift (pixels): {best_r_shift:.2f}")
+    print(f"🔵 Blue Channel Shift (pixels): {best_b_shift:.2f}")
+    print(f"📊 Overall Chromatic Aberration Score: {overall_score:.4f}%")
+
+    # --- Interpretation ---
+    print("🔍 Interpretation:")
+    if overall_score < 0.01:
+        print(" - Very low chromatic aberration. Excellent lens performance.")
+    elif overall_score < 0.05:
+        print(" - Minor chromatic aberration detected. Generally not visible.")
+    else:
+        print(" - Significant chromatic aberration detected. Fringing may be noticeable.")
+
+    return overall_score
+
 # --- Main Execution Block ---
 if __name__ == "__main__":
     try:
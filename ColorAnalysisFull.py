@@ -2,120 +2,135 @@ import cv2
 import numpy as np
 from PIL import Image
 import matplotlib.pyplot as plt
-from colormath.color_conversions import convert_color
-from colormath.color_objects import sRGBColor, LabColor
-from colormath.color_diff import delta_e_cie2000
-from image_utils import get_qc_image_path
+from color_utils import colorfulness as hasler_colorfulness, luminance_histogram, srgb_to_lab, delta_e_cie2000
+from image_utils import get_qc_image_path, load_image
 
-def calculate_colorfulness_metric(image_path):
+def calculate_colorfulness_metric(image_path, fast=False):
     print("\n=== 🎨 Colorfulness Metric ===")
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    # fast=True decodes at 1/8 scale (free for JPEG, via DCT scaling); good enough
+    # for this statistical summary when only a quick estimate is needed
+    image = load_image(image_path, cv2.IMREAD_REDUCED_COLOR_8 if fast else cv2.IMREAD_COLOR)
     if image is None:
         print(f"❌ Error: Image not found at path: {image_path}")
         return
 
-    (B, G, R) = cv2.split(image.astype("float32"))
-    rg = R - G
-    yb = 0.5 * (R + G) - B
-    std_rg = np.std(rg)
-    std_yb = np.std(yb)
-    mean_rg = np.mean(rg)
-    mean_yb = np.mean(yb)
-    colorfulness = np.sqrt((std_rg ** 2) + (std_yb ** 2)) + 0.3 * np.sqrt((mean_rg ** 2) + (mean_yb ** 2))
+    return calculate_colorfulness_metric_arr(image)
+
+def calculate_colorfulness_metric_arr(image):
+    # Means and standard deviations of rg and yb in a single pass over the uint8 BGR image
+    colorfulness = hasler_colorfulness(image)
     print(f"Colorfulness Score: {colorfulness:.2f}")
+    return colorfulness
 
-def analyze_tonal_distribution(image_path):
+def analyze_tonal_distribution(image_path, fast=False):
     print("\n=== 🌗 Tonal Distribution Analysis ===")
     try:
-        img = Image.open(image_path)
-        gray_img = img.convert('L')
-        img_array = np.array(gray_img)
-        total_pixels = img_array.size
-        if total_pixels == 0:
-            print("❌ Error: The image has no pixels.")
-            return
-
-        histogram, bins = np.histogram(img_array, bins=256, range=[0, 255])
-        shadow_pixels = histogram[0]
-        highlight_pixels = histogram[255]
-        shadow_percent = (shadow_pixels / total_pixels) * 100
-        highlight_percent = (highlight_pixels / total_pixels) * 100
-
-        print(f"Clipped Shadows   : {shadow_percent:.2f}% of pixels are pure black (value 0)")
-        print(f"Clipped Highlights: {highlight_percent:.2f}% of pixels are pure white (value 255)")
-
-        plt.figure(figsize=(10, 6))
-        plt.plot(bins[:-1], histogram, color='black')
-        plt.title('Luminance Histogram')
-        plt.xlabel('Pixel Intensity (0=Black, 255=White)')
-        plt.ylabel('Number of Pixels')
-        plt.grid(True)
-        plt.axvspan(0, 5, color='red', alpha=0.3, label='Shadow Clipping Zone')
-        plt.axvspan(250, 255, color='red', alpha=0.3, label='Highlight Clipping Zone')
-        plt.legend()
-        plt.show()
+        # fast=True decodes at 1/8 scale; the clipping percentages are then estimates
+        img_array = load_image(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_8 if fast else cv2.IMREAD_GRAYSCALE)
+        if img_array is None:
+            raise FileNotFoundError(image_path)
+        analyze_tonal_distribution_arr(img_array)
 
     except FileNotFoundError:
         print(f"❌ Error: The file '{image_path}' was not found.")
     except Exception as e:
         print(f"❌ An error occurred: {e}")
 
+def analyze_tonal_distribution_arr(img_array):
+    total_pixels = img_array.size
+    if total_pixels == 0:
+        print("❌ Error: The image has no pixels.")
+        return
+
+    # One (parallel) counting pass over the uint8 grayscale pixels
+    histogram = luminance_histogram(img_array)
+    shadow_pixels = histogram[0]
+    highlight_pixels = histogram[255]
+    shadow_percent = (shadow_pixels / total_pixels) * 100
+    highlight_percent = (highlight_pixels / total_pixels) * 100
+
+    print(f"Clipped Shadows   : {shadow_percent:.2f}% of pixels are pure black (value 0)")
+    print(f"Clipped Highlights: {highlight_percent:.2f}% of pixels are pure white (value 255)")
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(np.arange(256), histogram, color='black')
+    plt.title('Luminance Histogram')
+    plt.xlabel('Pixel Intensity (0=Black, 255=White)')
+    plt.ylabel('Number of Pixels')
+    plt.grid(True)
+    plt.axvspan(0, 5, color='red', alpha=0.3, label='Shadow Clipping Zone')
+    plt.axvspan(250, 255, color='red', alpha=0.3, label='Highlight Clipping Zone')
+    plt.legend()
+    plt.show()
+
 def analyze_color_accuracy_and_white_balance(image_path):
     print("\n=== 🎯 Color Accuracy and White Balance Analysis ===")
     try:
-        original_img = Image.open(image_path)
-        img_array = np.array(original_img).astype('float32')
-
-        r_avg = np.mean(img_array[:, :, 0])
-        g_avg = np.mean(img_array[:, :, 1])
-        b_avg = np.mean(img_array[:, :, 2])
-        gray_avg = (r_avg + g_avg + b_avg) / 3
-
-        r_gain = gray_avg / r_avg
-        g_gain = gray_avg / g_avg
-        b_gain = gray_avg / b_avg
-
-        wb_img_array = np.dstack([
-            img_array[:, :, 0] * r_gain,
-            img_array[:, :, 1] * g_gain,
-            img_array[:, :, 2] * b_gain
-        ])
-        wb_img_array = np.clip(wb_img_array, 0, 255).astype(np.uint8)
-        wb_img = Image.fromarray(wb_img_array)
-
-        width, height = original_img.size
-        combined_img = Image.new('RGB', (width * 2, height))
-        combined_img.paste(original_img, (0, 0))
-        combined_img.paste(wb_img, (width, 0))
-        combined_img.show(title="Original (Left) vs. White Balanced (Right)")
-        print("✅ White-balanced image preview generated. Please close the window to continue.")
-
-        original_avg_srgb = sRGBColor(r_avg / 255, g_avg / 255, b_avg / 255)
-        original_avg_lab = convert_color(original_avg_srgb, LabColor)
-        white_ref_lab = LabColor(lab_l=100.0, lab_a=0.0, lab_b=0.0)
-        delta_e = delta_e_cie2000(original_avg_lab, white_ref_lab)
-
-        print(f"Average RGB       : R:{r_avg:.2f}, G:{g_avg:.2f}, B:{b_avg:.2f}")
-        print(f"Delta E (CIEDE2000): {delta_e:.2f}")
-
-        if delta_e <= 1.0:
-            print("Conclusion: The color cast is not perceptible to the human eye. Excellent color accuracy.")
-        elif delta_e <= 2.0:
-            print("Conclusion: The color cast is perceptible with close observation. Very good color accuracy.")
-        else:
-            print("Conclusion: A significant color cast is present. Color accuracy is low.")
+        # convert('RGB') drops an alpha channel (and expands grayscale or palette
+        # images), so the array always has exactly the three channels used below
+        original_img = Image.open(image_path).convert('RGB')
+        analyze_color_accuracy_and_white_balance_arr(np.asarray(original_img))
 
     except FileNotFoundError:
         print(f"❌ Error: The file '{image_path}' was not found.")
     except Exception as e:
         print(f"❌ An error occurred: {e}")
 
+def analyze_color_accuracy_and_white_balance_arr(rgb_array):
+    # All three channel means in one pass over the uint8 RGB pixels
+    r_avg, g_avg, b_avg = rgb_array.reshape(-1, 3).mean(axis=0)
+    gray_avg = (r_avg + g_avg + b_avg) / 3
+
+    r_gain = gray_avg / r_avg
+    g_gain = gray_avg / g_avg
+    b_gain = gray_avg / b_avg
+
+    # Apply all three gains in one pass through a clipped per-channel lookup table
+    gains = np.array([r_gain, g_gain, b_gain])
+    lut = np.clip(np.arange(256)[:, None] * gains, 0, 255).astype(np.uint8)
+    wb_img_array = cv2.LUT(rgb_array, lut.reshape(1, 256, 3))
+    wb_img = Image.fromarray(wb_img_array)
+
+    height, width = rgb_array.shape[:2]
+    combined_img = Image.new('RGB', (width * 2, height))
+    combined_img.paste(Image.fromarray(rgb_array), (0, 0))
+    combined_img.paste(wb_img, (width, 0))
+    combined_img.show(title="Original (Left) vs. White Balanced (Right)")
+    print("✅ White-balanced image preview generated. Please close the window to continue.")
+
+    original_avg_lab = srgb_to_lab(np.array([r_avg, g_avg, b_avg]) / 255)
+    white_ref_lab = np.array([100.0, 0.0, 0.0])
+    delta_e = float(delta_e_cie2000(original_avg_lab, white_ref_lab))
+
+    print(f"Average RGB       : R:{r_avg:.2f}, G:{g_avg:.2f}, B:{b_avg:.2f}")
+    print(f"Delta E (CIEDE2000): {delta_e:.2f}")
+
+    if delta_e <= 1.0:
+        print("Conclusion: The color cast is not perceptible to the human eye. Excellent color accuracy.")
+    elif delta_e <= 2.0:
+        print("Conclusion: The color cast is perceptible with close observation. Very good color accuracy.")
+    else:
+        print("Conclusion: A significant color cast is present. Color accuracy is low.")
+
+    return delta_e
+
 if __name__ == "__main__":
     try:
         image_path = get_qc_image_path()
-        calculate_colorfulness_metric(image_path)
-        analyze_tonal_distribution(image_path)
-        analyze_color_accuracy_and_white_balance(image_path)
+
+        # Decode once and derive the BGR, grayscale and RGB views every analysis needs
+        bgr = load_image(image_path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise FileNotFoundError(f"File not found or unable to read: {image_path}")
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+        print("\n=== 🎨 Colorfulness Metric ===")
+        calculate_colorfulness_metric_arr(bgr)
+        print("\n=== 🌗 Tonal Distribution Analysis ===")
+        analyze_tonal_distribution_arr(gray)
+        print("\n=== 🎯 Color Accuracy and White Balance Analysis ===")
+        analyze_color_accuracy_and_white_balance_arr(rgb)
     except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
-        print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
\ No newline at end of file
+        print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
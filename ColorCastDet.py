@@ -2,15 +2,16 @@
 
 import cv2
 import numpy as np
-from image_utils import get_qc_image_path
+from image_utils import get_qc_image_path, load_image
 
 def detect_color_cast(image_path):
-    image = cv2.imread(image_path)
+    image = load_image(image_path)
     if image is None:
         print("Error: Image not found.")
         return None
 
-    mean_colors = np.mean(image, axis=(0, 1))
+    # Per-channel means in one pass over the uint8 pixels, without a float64 copy
+    mean_colors = np.array(cv2.mean(image)[:3])
     gray_level = np.mean(mean_colors)
     deviation = mean_colors - gray_level
     cast_strength = np.linalg.norm(deviation)
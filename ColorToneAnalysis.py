@@ -1,8 +1,9 @@
 import sys
-from PIL import Image
+import cv2
 import numpy as np
 import matplotlib.pyplot as plt
-from image_utils import get_qc_image_path
+from color_utils import luminance_histogram
+from image_utils import get_qc_image_path, load_image
 
 def analyze_tonal_distribution(image_path):
     """
@@ -13,14 +14,12 @@ def analyze_tonal_distribution(image_path):
         image_path (str): The path to the image file.
     """
     try:
-        # Open the image using Pillow
-        img = Image.open(image_path)
+        # Decode the image straight to grayscale for luminance analysis
+        img_array = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+        if img_array is None:
+            raise FileNotFoundError(image_path)
         print(f"✅ Successfully loaded image: {image_path}")
 
-        # Convert the image to grayscale for luminance analysis
-        gray_img = img.convert('L')
-        img_array = np.array(gray_img)
-
         # Get total number of pixels in the image
         total_pixels = img_array.size
         if total_pixels == 0:
@@ -28,8 +27,9 @@ def analyze_tonal_distribution(image_path):
             return
 
         # Calculate the histogram of the grayscale image
-        # The range is 0-255 for 8-bit images
-        histogram, bins = np.histogram(img_array, bins=256, range=[0, 255])
+        # Pixel values are 0-255 for 8-bit images, so one bin per value is a plain
+        # count, done in a single parallel pass
+        histogram = luminance_histogram(img_array)
 
         # Find clipped pixels (pure black or pure white)
         shadow_pixels = histogram[0]  # Pixels with a value of 0 (pure black)
@@ -45,7 +45,7 @@ def analyze_tonal_distribution(image_path):
         
         # Plot the histogram
         plt.figure(figsize=(10, 6))
-        plt.plot(bins[:-1], histogram, color='black')
+        plt.plot(np.arange(256), histogram, color='black')
         plt.title('Luminance Histogram')
         plt.xlabel('Pixel Intensity (0=Black, 255=White)')
         plt.ylabel('Number of Pixels')
@@ -67,6 +67,7 @@ if __name__ == "__main__":
     try:
         # Define the fixed image path
         image_file = get_qc_image_path()
-        analyze_tonal_distribution(image_file)    except (FileNotFoundError, ValueError) as e:
+        analyze_tonal_distribution(image_file)
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
\ No newline at end of file
@@ -8,9 +8,10 @@
 #    pixels in the image.
 
 import cv2
-import numpy as np
 import os
 import glob
+import multiprocessing
+from image_utils import load_image
 
 def calculate_luminance_std_dev(image_path):
     """
@@ -27,17 +28,31 @@ def calculate_luminance_std_dev(image_path):
     Raises:
         FileNotFoundError: If the image file is not found.
     """
-    image = cv2.imread(image_path)
+    image = load_image(image_path)
     if image is None:
         raise FileNotFoundError(f"Image not found at path: {image_path}")
 
-    # Convert the image to the HSV color space
-    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    # The V channel represents the value or luminance of the image
-    luminance_channel = hsv[:, :, 2]
+    return calculate_luminance_std_dev_arr(image)
+
+def calculate_luminance_std_dev_arr(image):
+    """
+    Luminance standard deviation of an already-decoded BGR image.
+
+    Args:
+        image (ndarray): uint8 BGR image.
+
+    Returns:
+        float: The standard deviation of the luminance channel.
+    """
+    # The V channel of HSV (the value or luminance of the image) is max(B, G, R);
+    # take it directly instead of running the full HSV conversion for H and S too
+    b, g, r = cv2.split(image)
+    luminance_channel = cv2.max(cv2.max(b, g), r)
     
-    # Calculate the standard deviation
-    std_dev = np.std(luminance_channel)
+    # Calculate the standard deviation in one pass over the uint8 channel,
+    # accumulated in double, with no float copy of the image
+    _, std = cv2.meanStdDev(luminance_channel)
+    std_dev = float(std[0, 0])
     return std_dev
 
 def calculate_pixel_intensity_range(image_path):
@@ -54,18 +69,44 @@ def calculate_pixel_intensity_range(image_path):
     Raises:
         FileNotFoundError: If the image file is not found.
     """
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
     if image is None:
         raise FileNotFoundError(f"Image not found at path: {image_path}")
 
-    # Find the minimum and maximum pixel values
-    min_val = np.min(image)
-    max_val = np.max(image)
+    return calculate_pixel_intensity_range_arr(image)
+
+def calculate_pixel_intensity_range_arr(image):
+    """
+    Pixel intensity range of an already-decoded grayscale image.
+
+    Args:
+        image (ndarray): uint8 grayscale image.
+
+    Returns:
+        int: The difference between the maximum and minimum pixel intensity.
+    """
+    # Find the minimum and maximum pixel values together in a single pass
+    min_val, max_val, _, _ = cv2.minMaxLoc(image)
     
     # Calculate the range
-    intensity_range = max_val - min_val
+    intensity_range = int(max_val - min_val)
     return intensity_range
 
+def _process_one(img_path):
+    """
+    Worker for the batch run: decodes one image once and computes both metrics from it,
+    returning the error instead of raising so one bad file doesn't stop the pool.
+    """
+    try:
+        image = load_image(img_path)
+        if image is None:
+            raise FileNotFoundError(f"Image not found at path: {img_path}")
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return (img_path, calculate_luminance_std_dev_arr(image),
+                calculate_pixel_intensity_range_arr(gray), None)
+    except Exception as e:
+        return img_path, None, None, e
+
 if __name__ == "__main__":
     # Define the directory where your images are located
     image_directory = "QCImages"
@@ -78,16 +119,18 @@ if __name__ == "__main__":
     else:
         print(f"Found {len(image_files)} image(s) to analyze.")
         print("---")
-        for img_path in image_files:
-            file_name = os.path.basename(img_path)
-            
-            try:
-                std_dev_score = calculate_luminance_std_dev(img_path)
-                intensity_range = calculate_pixel_intensity_range(img_path)
-                
+
+        # Each image is independent, so process them on all cores (spawned workers,
+        # which stay safe if a metric starts its own thread pool)
+        with multiprocessing.get_context("spawn").Pool() as pool:
+            results = pool.imap_unordered(_process_one, image_files, chunksize=4)
+            for img_path, std_dev_score, intensity_range, error in results:
+                file_name = os.path.basename(img_path)
+                if error is not None:
+                    print(f"An error occurred while processing {file_name}: {error}")
+                    continue
+
                 print(f"Image: {file_name}")
                 print(f"  Luminance Standard Deviation = {std_dev_score:.2f}")
                 print(f"  Pixel Intensity Range = {intensity_range}")
                 print("---")
-            except Exception as e:
-                print(f"An error occurred while processing {file_name}: {e}")
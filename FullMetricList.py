@@ -1,17 +1,32 @@
 # FullMetricList.py
 
 import os
+import importlib.util
+import shutil
+import tempfile
 import cv2
 import numpy as np
 from PIL import Image
-import matplotlib.pyplot as plt
-from scipy.ndimage import convolve
-import pywt
-import piexif
-from colormath.color_conversions import convert_color
-from colormath.color_objects import sRGBColor, LabColor
-from colormath.color_diff import delta_e_cie2000
-from image_utils import get_qc_image_path
+from BrennerQC import calculate_brenner_sharpness_arr as _brenner_arr
+from GabVarQC import separable_gabor_kernels
+from color_utils import colorfulness, luminance_histogram, srgb_to_lab, delta_e_cie2000
+from image_utils import get_qc_image_path, load_image, read_exif_summary
+
+# joblib is optional; without it the metrics run one after another. Only check that
+# it is installed here and import it when the metrics actually run, so importing
+# this module (e.g. for a single metric) doesn't pay for it.
+HAVE_JOBLIB = importlib.util.find_spec("joblib") is not None
+
+# Fused gradient kernel from qc_kernels; without Numba, gradient_family runs the
+# separate OpenCV filters
+try:
+    from qc_kernels import gradient_moments as _gradient_moments
+except ImportError:
+    _gradient_moments = None
+
+# Gabor kernel for calculate_gabor_variance as its two 1-D factors (theta=0 makes it
+# separable), built once rather than on every call
+GABOR_KERNEL_X, GABOR_KERNEL_Y = separable_gabor_kernels(31, 4.0, 10.0, 0.5, 0)
 
 # --- Image Statistics ---
 def get_image_statistics(image_path):
@@ -20,8 +35,12 @@ def get_image_statistics(image_path):
             print(f"Error: File not found at {image_path}")
             return
 
-        pil_image = Image.open(image_path)
-        width, height = pil_image.size
+        # Image.open only parses the header, so the size, mode and EXIF block are
+        # read without decoding any pixel data; the file is closed straight after
+        with Image.open(image_path) as pil_image:
+            width, height = pil_image.size
+            color_space = pil_image.mode
+            camera_model, exposure_time, iso = read_exif_summary(pil_image)
         megapixels = (width * height) / 1_000_000.0
         file_size_kb = os.path.getsize(image_path) / 1024.0
 
@@ -36,7 +55,6 @@ def get_image_statistics(image_path):
             mp_label = "Other"
 
         # Bit depth and color space
-        color_space = pil_image.mode
         if 'L' in color_space:
             bit_depth = 8
         elif 'RGB' in color_space:
@@ -46,23 +64,6 @@ def get_image_statistics(image_path):
         else:
             bit_depth = "unknown"
 
-        # EXIF data
-        try:
-            exif_dict = piexif.load(image_path)
-            camera_model = exif_dict.get("0th", {}).get(piexif.ImageIFD.Make)
-            if camera_model:
-                camera_model = camera_model.decode('utf-8')
-
-            exposure_time = exif_dict.get("Exif", {}).get(piexif.ExifIFD.ExposureTime)
-            if exposure_time and len(exposure_time) == 2:
-                exposure_time = f"{exposure_time[0]}/{exposure_time[1]} sec"
-
-            iso = exif_dict.get("Exif", {}).get(piexif.ExifIFD.ISOSpeedRatings)
-        except Exception:
-            camera_model = "N/A"
-            exposure_time = "N/A"
-            iso = "N/A"
-
         # Print attributes
         print("--- Image File Attributes ---")
         print(f"filename = {os.path.basename(image_path)}")
@@ -80,125 +81,235 @@ def get_image_statistics(image_path):
         print(f"An error occurred while getting image statistics: {e}")
 
 # --- Sharpness Metrics ---
+# Each metric has a path version and an `_arr` version that takes an already-decoded
+# uint8 image, so run_all_analyses can decode the file once and share the arrays.
 def calculate_laplacian_variance(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    return cv2.Laplacian(image, cv2.CV_64F).var() if image is not None else 0
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_laplacian_variance_arr(image) if image is not None else 0
+
+def calculate_laplacian_variance_arr(gray):
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+    return float(std[0, 0]) ** 2
 
 def calculate_brenner_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    return np.sum(np.diff(image, n=2, axis=0) ** 2) if image is not None else 0
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_brenner_sharpness_arr(image) if image is not None else 0
+
+def calculate_brenner_sharpness_arr(gray):
+    # Sum of squared differences between pixels two rows apart, using BrennerQC's
+    # single-pass parallel kernel (compiled extension or Numba when available)
+    return _brenner_arr(gray)
 
 def count_canny_edges(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    return cv2.countNonZero(cv2.Canny(image, 100, 200)) if image is not None else 0
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return count_canny_edges_arr(image) if image is not None else 0
+
+def count_canny_edges_arr(gray):
+    return cv2.countNonZero(cv2.Canny(gray, 100, 200))
 
 def calculate_fft_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    f = np.fft.fft2(image)
-    fshift = np.fft.fftshift(f)
-    rows, cols = image.shape
-    crow, ccol = rows // 2, cols // 2
-    fshift[crow-30:crow+30, ccol-30:ccol+30] = 0
-    return np.sum(np.abs(np.fft.ifftshift(fshift)))
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_fft_sharpness_arr(image) if image is not None else 0
+
+def calculate_fft_sharpness_arr(gray):
+    # Threaded single-precision FFT. The 60x60 low-frequency window around the
+    # centre of the shifted spectrum is the four 30x30 corners of the unshifted
+    # one, so zero those directly instead of shifting there and back (the sum of
+    # magnitudes doesn't depend on the layout).
+    from scipy import fft as sp_fft  # deferred: only this metric needs it
+    f = sp_fft.fft2(np.float32(gray), workers=-1)
+    # Frequencies -30..29 on each axis, wrapped into range: an axis shorter than
+    # 60 lies entirely inside the window, as in the shifted version, rather than
+    # indexing out of bounds
+    rows, cols = f.shape
+    low_rows = np.unique(np.r_[0:30, -30:0] % rows)
+    low_cols = np.unique(np.r_[0:30, -30:0] % cols)
+    f[np.ix_(low_rows, low_cols)] = 0
+    return np.sum(np.abs(f), dtype=np.float64)
 
 def calculate_gabor_variance(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    kernel = cv2.getGaborKernel((31, 31), 4.0, 0, 10.0, 0.5, 0, ktype=cv2.CV_64F)
-    return np.var(cv2.filter2D(image, cv2.CV_64F, kernel))
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_gabor_variance_arr(image) if image is not None else 0
+
+def calculate_gabor_variance_arr(gray):
+    # meanStdDev reduces in one pass, without var()'s squared-deviation temporary
+    _, std = cv2.meanStdDev(cv2.sepFilter2D(gray, cv2.CV_32F, GABOR_KERNEL_X, GABOR_KERNEL_Y))
+    return float(std[0, 0]) ** 2
 
 def calculate_tenengrad_metric(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0)
-    sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1)
-    return np.sum(np.sqrt(sobelx**2 + sobely**2)**2)
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_tenengrad_metric_arr(image) if image is not None else 0
+
+def calculate_tenengrad_metric_arr(gray):
+    return sobel_family(gray)['tenengrad']
 
 def calculate_wavelet_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    _, (LH, HL, HH) = pywt.dwt2(image, 'haar')
-    return np.sqrt(np.mean(LH**2) + np.mean(HL**2) + np.mean(HH**2))
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_wavelet_sharpness_arr(image) if image is not None else 0
+
+def calculate_wavelet_sharpness_arr(gray):
+    # Single-level Haar detail bands straight from the 2x2 blocks (what
+    # pywt.dwt2(gray, 'haar') computes, without the approximation band). An odd
+    # edge is extended symmetrically, matching pywt's default mode.
+    rows, cols = gray.shape
+    if rows % 2 or cols % 2:
+        gray = cv2.copyMakeBorder(gray, 0, rows % 2, 0, cols % 2, cv2.BORDER_REFLECT)
+    a = gray.astype(np.float32)
+    a00, a01, a10, a11 = a[0::2, 0::2], a[0::2, 1::2], a[1::2, 0::2], a[1::2, 1::2]
+    LH = (a00 + a01 - a10 - a11) * 0.5
+    HL = (a00 - a01 + a10 - a11) * 0.5
+    HH = (a00 - a01 - a10 + a11) * 0.5
+    return np.sqrt((cv2.norm(LH, cv2.NORM_L2SQR) + cv2.norm(HL, cv2.NORM_L2SQR)
+                    + cv2.norm(HH, cv2.NORM_L2SQR)) / LH.size)
 
 def calculate_gradient_metric(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0)
-    sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1)
-    return np.mean(np.sqrt(sobelx**2 + sobely**2))
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_gradient_metric_arr(image) if image is not None else 0
+
+def calculate_gradient_metric_arr(gray):
+    return sobel_family(gray)['grad_mean']
 
 def calculate_local_variance(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    return np.var(convolve(image, np.ones((3, 3)) / 9, mode='reflect')) if image is not None else 0
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_local_variance_arr(image) if image is not None else 0
+
+def calculate_local_variance_arr(gray):
+    # 3x3 mean filter; boxFilter runs it as two separable 1D passes. BORDER_REFLECT
+    # matches scipy's 'reflect' mode and ddepth=-1 keeps the uint8 output type.
+    _, std = cv2.meanStdDev(cv2.boxFilter(gray, -1, (3, 3), borderType=cv2.BORDER_REFLECT))
+    return float(std[0, 0]) ** 2
 
 def calculate_normalized_average_gradient(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    grad_x = cv2.Sobel(image, cv2.CV_64F, 1, 0)
-    grad_y = cv2.Sobel(image, cv2.CV_64F, 0, 1)
-    return np.mean(np.sqrt(grad_x**2 + grad_y**2)) / np.mean(image)
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_normalized_average_gradient_arr(image) if image is not None else 0
+
+def calculate_normalized_average_gradient_arr(gray):
+    return sobel_family(gray)['norm_avg_grad']
 
 def calculate_sobel_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0)
-    sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1)
-    return np.sum(np.sqrt(sobelx**2 + sobely**2))
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_sobel_sharpness_arr(image) if image is not None else 0
+
+def calculate_sobel_sharpness_arr(gray):
+    return sobel_family(gray)['sobel_sum']
+
+def sobel_family(gray):
+    """
+    Computes the four Sobel-based metrics (Tenengrad, Gradient, Normalized Avg
+    Gradient, Sobel Sharpness) from a single pair of Sobel derivatives and one
+    gradient magnitude buffer, instead of four separate passes over the image.
+    float32 derivatives are exact for uint8 input; the sums accumulate in float64.
+
+    Returns:
+        dict: 'sobel_sum', 'tenengrad', 'grad_mean' and 'norm_avg_grad'.
+    """
+    sx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    sy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    mag = cv2.magnitude(sx, sy)
+    s = float(mag.sum(dtype=np.float64))
+    # Tenengrad is the sum of squared magnitudes, i.e. sum(sx^2) + sum(sy^2); taking it
+    # from the derivatives keeps it exact instead of squaring the rounded magnitude
+    s2 = cv2.norm(sx, cv2.NORM_L2SQR) + cv2.norm(sy, cv2.NORM_L2SQR)
+    m = s / mag.size
+    return {'sobel_sum': s, 'tenengrad': s2, 'grad_mean': m, 'norm_avg_grad': m / cv2.mean(gray)[0]}
+
+def gradient_family(gray):
+    """
+    The Sobel family plus the Laplacian variance. With Numba available all five
+    come out of a single fused read of the image; otherwise the OpenCV filters
+    run separately.
+
+    Returns:
+        dict: The sobel_family keys plus 'laplacian_var'.
+    """
+    if _gradient_moments is None:
+        metrics = sobel_family(gray)
+        metrics['laplacian_var'] = calculate_laplacian_variance_arr(gray)
+        return metrics
+
+    pixel_sum, lap_sum, lap_sq_sum, grad_sq_sum, mag_sum = _gradient_moments(gray)
+    n = gray.size
+    lap_mean = lap_sum / n
+    m = mag_sum / n
+    return {'sobel_sum': mag_sum, 'tenengrad': float(grad_sq_sum), 'grad_mean': m,
+            'norm_avg_grad': m / (pixel_sum / n), 'laplacian_var': lap_sq_sum / n - lap_mean * lap_mean}
 
 # --- Noise Analysis ---
 def analyze_noise(image_path):
-    image = cv2.imread(image_path)
+    image = load_image(image_path)
     if image is None: return
-    yuv = cv2.cvtColor(image, cv2.COLOR_BGR2YUV)
-    y, u, v = yuv[:, :, 0], yuv[:, :, 1], yuv[:, :, 2]
+    analyze_noise_arr(image)
+
+def analyze_noise_arr(bgr):
+    yuv = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV)
+    # Standard deviations of Y, U and V together in one pass over the interleaved image
+    _, (y_std, u_std, v_std) = cv2.meanStdDev(yuv)
+    # The Laplacian of 8-bit data fits exactly in 16-bit integers
+    _, lap_std = cv2.meanStdDev(cv2.Laplacian(yuv[:, :, 0], cv2.CV_16S))
     print("--- Overall Noise Analysis ---")
-    print(f"📈 Laplacian Variance: {cv2.Laplacian(y, cv2.CV_64F).var():.2f}")
+    print(f"📈 Laplacian Variance: {lap_std[0, 0] ** 2:.2f}")
     print("--- Advanced Noise Analysis ---")
-    print(f"📊 Luminance Noise: {np.std(y):.2f}")
-    print(f"🎨 Chrominance Noise: {np.std(u) + np.std(v):.2f}")
+    print(f"📊 Luminance Noise: {y_std[0]:.2f}")
+    print(f"🎨 Chrominance Noise: {u_std[0] + v_std[0]:.2f}")
 
 def calculate_noise_metric(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None: return 0
-    denoised = cv2.medianBlur(image, 5)
-    noise = image.astype(np.int16) - denoised.astype(np.int16)
-    return np.mean(noise**2)
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+    return calculate_noise_metric_arr(image) if image is not None else 0
+
+def calculate_noise_metric_arr(gray):
+    # The two-array cv2.norm differences, squares and sums in one pass, so the
+    # median is the only allocation
+    median = cv2.medianBlur(gray, 5)
+    return cv2.norm(gray, median, cv2.NORM_L2SQR) / median.size
 
 # --- Artifact Analysis ---
 def analyze_chromatic_aberration(image_path):
-    image = cv2.imread(image_path)
+    image = load_image(image_path)
     if image is None: return
-    B, G, R = cv2.split(image)
-    b_edge = cv2.Canny(B, 50, 150)
-    r_edge = cv2.Canny(R, 50, 150)
+    analyze_chromatic_aberration_arr(image)
+
+def analyze_chromatic_aberration_arr(bgr, scale=0.25):
+    # Estimate the red-vs-blue misregistration by phase correlation (FFT-based,
+    # sub-pixel) on area-downsampled channels, windowed to suppress the image
+    # border; the shift is scaled back to full-resolution pixels
+    B, _, R = cv2.split(bgr)
+    small_b = cv2.resize(B, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA).astype(np.float32)
+    small_r = cv2.resize(R, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA).astype(np.float32)
     print("--- Chromatic Aberration Analysis ---")
-    if b_edge.any() and r_edge.any():
-        try:
-            shift_y, shift_x = np.unravel_index(np.argmax(cv2.matchTemplate(b_edge, r_edge, cv2.TM_CCOEFF_NORMED)), b_edge.shape)
-            print(f"Red Channel Shift: {shift_x}")
-            print(f"Blue Channel Shift: {shift_y}")
-        except:
-            print("Could not compute channel shift.")
-    else:
-        print("Insufficient edge data for analysis.")
+    if small_b.shape[0] < 2 or small_b.shape[1] < 2:
+        print("Image too small for channel shift analysis.")
+        return
+    window = cv2.createHanningWindow(small_b.shape[::-1], cv2.CV_32F)
+    (dx, dy), response = cv2.phaseCorrelate(small_b, small_r, window)
+    print(f"Red vs Blue Channel Shift: x = {dx / scale:.2f}px, y = {dy / scale:.2f}px (confidence {response:.2f})")
 
 def analyze_compression_artifacts(image_path):
-    image = cv2.imread(image_path)
-    if image is None: return 0
-    blurred = cv2.GaussianBlur(image, (5, 5), 0)
-    return np.sum(cv2.absdiff(image, blurred))
+    image = load_image(image_path)
+    return analyze_compression_artifacts_arr(image) if image is not None else 0
+
+def analyze_compression_artifacts_arr(bgr):
+    blurred = cv2.GaussianBlur(bgr, (5, 5), 0)
+    return np.sum(cv2.absdiff(bgr, blurred))
 
 # --- Optical Metrics ---
 def analyze_lens_distortion(image_path):
     print("Lens distortion analysis requires a grid reference image. Skipping.")
 
-def analyze_vignetting(image_path):
-    image = cv2.imread(image_path)
+# The reduced-resolution analyses below only need averages over large regions, so
+# with fast=True they decode at 1/4 scale (JPEGs scale in the DCT domain, cutting
+# decode time and memory about 4-16x) instead of materialising the full image.
+REDUCED_SCALE = 4
+
+def analyze_vignetting(image_path, fast=False):
+    image = load_image(image_path, cv2.IMREAD_REDUCED_COLOR_4 if fast else cv2.IMREAD_COLOR)
     if image is None: return
-    h, w = image.shape[:2]
-    center = image[h//2-50:h//2+50, w//2-50:w//2+50]
-    corners = [image[:100, :100], image[:100, -100:], image[-100:, :100], image[-100:, -100:]]
+    analyze_vignetting_arr(image, patch=100 // REDUCED_SCALE if fast else 100)
+
+def analyze_vignetting_arr(bgr, patch=100):
+    h, w = bgr.shape[:2]
+    half = patch // 2
+    center = bgr[h//2-half:h//2+half, w//2-half:w//2+half]
+    corners = [bgr[:patch, :patch], bgr[:patch, -patch:], bgr[-patch:, :patch], bgr[-patch:, -patch:]]
     center_brightness = np.mean(center)
     corners_brightness = np.mean([np.mean(c) for c in corners])
     score = (corners_brightness - center_brightness) / center_brightness * 100
@@ -208,79 +319,157 @@ def analyze_vignetting(image_path):
     print(f"💡 Vignetting Score: {score:.2f}%")
 
 # --- Color Analysis ---
-def calculate_colorfulness_metric(image_path):
+def calculate_colorfulness_metric(image_path, stride=1, fast=False):
     print("\n=== 🎨 Colorfulness Metric ===")
-    image = cv2.imread(image_path)
+    image = load_image(image_path, cv2.IMREAD_REDUCED_COLOR_4 if fast else cv2.IMREAD_COLOR)
     if image is None: return
-    B, G, R = cv2.split(image.astype("float32"))
-    rg = R - G
-    yb = 0.5 * (R + G) - B
-    score = np.sqrt(np.std(rg)**2 + np.std(yb)**2) + 0.3 * np.sqrt(np.mean(rg)**2 + np.mean(yb)**2)
+    calculate_colorfulness_metric_arr(image, stride)
+
+def calculate_colorfulness_metric_arr(bgr, stride=1):
+    # Hasler-Suesstrunk moments of rg and yb accumulated in one pass over the uint8
+    # pixels (no float copies or rg/yb temporaries). stride > 1 samples every
+    # stride-th row and column, a strided view, for an estimate at 1/stride^2 the work.
+    score = colorfulness(bgr[::stride, ::stride])
     print(f"Colorfulness Score: {score:.2f}")
 
-def analyze_tonal_distribution(image_path):
+def analyze_tonal_distribution(image_path, fast=False, show_plot=False):
     print("\n=== 🌗 Tonal Distribution Analysis ===")
-    img = Image.open(image_path).convert('L')
-    arr = np.array(img)
-    hist, bins = np.histogram(arr, bins=256, range=[0, 255])
-    total = arr.size
+    arr = load_image(image_path, cv2.IMREAD_REDUCED_GRAYSCALE_4 if fast else cv2.IMREAD_GRAYSCALE)
+    if arr is None: return
+    analyze_tonal_distribution_arr(arr, show_plot)
+
+def analyze_tonal_distribution_arr(gray, show_plot=False):
+    # One bin per 8-bit level, counted in a single parallel pass
+    hist = luminance_histogram(gray)
+    total = gray.size
     print(f"Clipped Shadows: {hist[0]/total*100:.2f}%")
     print(f"Clipped Highlights: {hist[255]/total*100:.2f}%")
-    plt.plot(bins[:-1], hist, color='black')
+    if not show_plot:
+        return
+
+    # matplotlib is slow to import, so only pay for it when a plot is wanted
+    import matplotlib.pyplot as plt
+    plt.plot(np.arange(256), hist, color='black')
     plt.title("Luminance Histogram")
     plt.xlabel("Intensity")
     plt.ylabel("Pixels")
     plt.grid(True)
     plt.show()
 
-def analyze_color_accuracy_and_white_balance(image_path):
+def analyze_color_accuracy_and_white_balance(image_path, fast=False, preview=False):
     print("\n=== 🎯 Color Accuracy and White Balance Analysis ===")
-    img = Image.open(image_path)
-    arr = np.array(img).astype('float32')
-    r, g, b = np.mean(arr[:, :, 0]), np.mean(arr[:, :, 1]), np.mean(arr[:, :, 2])
-    gray = (r + g + b) / 3
-    r_gain, g_gain, b_gain = gray / r, gray / g, gray / b
-    corrected = np.clip(np.dstack([arr[:, :, 0]*r_gain, arr[:, :, 1]*g_gain, arr[:, :, 2]*b_gain]), 0, 255).astype(np.uint8)
-    Image.fromarray(corrected).show()
-    original_lab = convert_color(sRGBColor(r/255, g/255, b/255), LabColor)
-    white_lab = LabColor(100.0, 0.0, 0.0)
-    delta_e = delta_e_cie2000(original_lab, white_lab)
+    image = load_image(image_path, cv2.IMREAD_REDUCED_COLOR_4 if fast else cv2.IMREAD_COLOR)
+    if image is None: return
+    analyze_color_accuracy_and_white_balance_arr(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), preview)
+
+def analyze_color_accuracy_and_white_balance_arr(rgb, preview=False):
+    # Channel means straight from the uint8 image; Delta E only needs these three numbers
+    r, g, b = cv2.mean(rgb)[:3]
+    if preview:
+        # The white-balanced image is only for viewing (and opens an external viewer),
+        # so it is built only on request: the gains applied through a per-channel LUT
+        gray = (r + g + b) / 3
+        gains = np.array([gray / r, gray / g, gray / b])
+        lut = np.clip(np.arange(256)[:, None] * gains, 0, 255).astype(np.uint8)
+        Image.fromarray(cv2.LUT(rgb, lut.reshape(1, 256, 3))).show()
+    original_lab = srgb_to_lab(np.array([r, g, b]) / 255)
+    white_lab = np.array([100.0, 0.0, 0.0])
+    delta_e = float(delta_e_cie2000(original_lab, white_lab))
     print(f"Delta E (CIEDE2000): {delta_e:.2f}")
 
 # --- Master Function ---
-def run_all_analyses(image_path):
+def _compute_scalar_metrics(gray, bgr):
+    """
+    Computes every metric that returns a single number. They are independent of
+    each other, so with joblib available they run in separate processes on all
+    cores. The arrays are dumped to a memory-mapped file once, so each worker maps
+    the same pages instead of receiving a pickled copy of a 50MP image.
+
+    Returns:
+        dict: Printed metric label -> value.
+    """
+    tasks = [
+        ("Brenner Metric", calculate_brenner_sharpness_arr, "gray"),
+        ("Canny Edge Count", count_canny_edges_arr, "gray"),
+        ("FFT Sharpness", calculate_fft_sharpness_arr, "gray"),
+        ("Gabor Variance", calculate_gabor_variance_arr, "gray"),
+        ("Gradient family", gradient_family, "gray"),
+        ("Wavelet Sharpness", calculate_wavelet_sharpness_arr, "gray"),
+        ("Local Variance", calculate_local_variance_arr, "gray"),
+        ("Noise Metric", calculate_noise_metric_arr, "gray"),
+        ("Compression Artifact Score", analyze_compression_artifacts_arr, "bgr"),
+    ]
+
+    if not HAVE_JOBLIB:
+        arrays = {"gray": gray, "bgr": bgr}
+        values = [fn(arrays[src]) for _, fn, src in tasks]
+    else:
+        values = _run_parallel(tasks, gray, bgr)
+    metrics = {label: value for (label, _, _), value in zip(tasks, values)}
+
+    # The Laplacian and the four Sobel metrics come out of one fused pass
+    sobel = metrics.pop("Gradient family")
+    metrics["Laplacian Variance"] = sobel['laplacian_var']
+    metrics["Tenengrad Metric"] = sobel['tenengrad']
+    metrics["Gradient Metric"] = sobel['grad_mean']
+    metrics["Normalized Avg Gradient"] = sobel['norm_avg_grad']
+    metrics["Sobel Sharpness"] = sobel['sobel_sum']
+    return metrics
+
+def _run_parallel(tasks, gray, bgr):
+    """Runs (label, fn, source) tasks on all cores over memory-mapped copies of the arrays."""
+    from joblib import Parallel, delayed, dump, load
+    mmap_dir = tempfile.mkdtemp(prefix="photoqc_")
+    try:
+        arrays = {}
+        for src, arr in (("gray", gray), ("bgr", bgr)):
+            mmap_path = os.path.join(mmap_dir, f"{src}.mmap")
+            dump(arr, mmap_path)
+            arrays[src] = load(mmap_path, mmap_mode='r')
+        # loky starts fresh worker processes rather than forking this one
+        values = Parallel(n_jobs=-1, backend='loky')(
+            delayed(fn)(arrays[src]) for _, fn, src in tasks)
+    finally:
+        shutil.rmtree(mmap_dir, ignore_errors=True)
+    return values
+
+def run_all_analyses(image_path, show_plot=False, preview=False):
     print("🌟" * 10 + " Full Image Quality Analysis " + "🌟" * 10)
     get_image_statistics(image_path)
 
+    # Decode once and share the arrays between every metric instead of letting
+    # each one re-read and re-decode the file
+    bgr = load_image(image_path)
+    if bgr is None:
+        raise FileNotFoundError(f"Could not decode image: {image_path}")
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    metrics = _compute_scalar_metrics(gray, bgr)
+
     print("\n===== Sharpness and Focus Metrics =====")
-    print(f"Laplacian Variance: {calculate_laplacian_variance(image_path):.2f}")
-    print(f"Brenner Metric: {calculate_brenner_sharpness(image_path):.2f}")
-    print(f"Canny Edge Count: {count_canny_edges(image_path):.2f}")
-    print(f"FFT Sharpness: {calculate_fft_sharpness(image_path):.2f}")
-    print(f"Gabor Variance: {calculate_gabor_variance(image_path):.2f}")
-    print(f"Tenengrad Metric: {calculate_tenengrad_metric(image_path):.2f}")
-    print(f"Wavelet Sharpness: {calculate_wavelet_sharpness(image_path):.2f}")
-    print(f"Gradient Metric: {calculate_gradient_metric(image_path):.2f}")
-    print(f"Local Variance: {calculate_local_variance(image_path):.2f}")
-    print(f"Normalized Avg Gradient: {calculate_normalized_average_gradient(image_path):.2f}")
-    print(f"Sobel Sharpness: {calculate_sobel_sharpness(image_path):.2f}")
+    for label in ("Laplacian Variance", "Brenner Metric", "Canny Edge Count", "FFT Sharpness",
+                  "Gabor Variance", "Tenengrad Metric", "Wavelet Sharpness", "Gradient Metric",
+                  "Local Variance", "Normalized Avg Gradient", "Sobel Sharpness"):
+        print(f"{label}: {metrics[label]:.2f}")
 
     print("\n===== Noise and Grain Analysis =====")
-    analyze_noise(image_path)
-    print(f"Noise Metric: {calculate_noise_metric(image_path):.2f}")
+    analyze_noise_arr(bgr)
+    print(f"Noise Metric: {metrics['Noise Metric']:.2f}")
 
     print("\n===== Image Integrity and Artifacts =====")
-    analyze_chromatic_aberration(image_path)
-    print(f"Compression Artifact Score: {analyze_compression_artifacts(image_path):.2f}")
+    analyze_chromatic_aberration_arr(bgr)
+    print(f"Compression Artifact Score: {metrics['Compression Artifact Score']:.2f}")
 
     print("\n===== Optical and Geometric Metrics =====")
     analyze_lens_distortion(image_path)
-    analyze_vignetting(image_path)
+    analyze_vignetting_arr(bgr)
 
     print("\n===== Color Analysis =====")
-    calculate_colorfulness_metric(image_path)
-    analyze_tonal_distribution(image_path)
-    analyze_color_accuracy_and_white_balance(image_path)
+    print("\n=== 🎨 Colorfulness Metric ===")
+    calculate_colorfulness_metric_arr(bgr)
+    print("\n=== 🌗 Tonal Distribution Analysis ===")
+    analyze_tonal_distribution_arr(gray, show_plot)
+    print("\n=== 🎯 Color Accuracy and White Balance Analysis ===")
+    analyze_color_accuracy_and_white_balance_arr(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), preview)
 
     print("\n✅" * 10 + " Full Analysis Complete! " + "✅" * 10)
 
@@ -288,7 +477,7 @@ def run_all_analyses(image_path):
 if __name__ == "__main__":
     try:
         image_file = get_qc_image_path()
-        run_all_analyses(image_file)
+        run_all_analyses(image_file, show_plot=True, preview=True)
     except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
@@ -1,45 +1,57 @@
 import cv2
-import numpy as np
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from image_utils import load_image
+from BrennerQC import calculate_brenner_sharpness_arr as _brenner_arr
+from GabVarQC import calculate_gabor_variance_arr as _gabor_arr
+from TenengradQC import calculate_tenengrad_sharpness_arr as _tenengrad_arr
 
-def calculate_laplacian_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+def _load_gray(image_path):
+    image = load_image(image_path, cv2.IMREAD_GRAYSCALE)
     if image is None:
         raise FileNotFoundError(f"Image not found: {image_path}")
-    return cv2.Laplacian(image, cv2.CV_64F).var()
+    return image
+
+def calculate_laplacian_sharpness(image_path):
+    return calculate_laplacian_sharpness_arr(_load_gray(image_path))
+
+def calculate_laplacian_sharpness_arr(image):
+    # float32 is exact for the Laplacian of uint8 input; meanStdDev accumulates in double
+    _, std = cv2.meanStdDev(cv2.Laplacian(image, cv2.CV_32F))
+    return std[0, 0] ** 2
 
 def calculate_brenner_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    shifted = np.roll(image, -2, axis=0)
-    diff = image[:-2, :] - shifted[:-2, :]
-    return np.sum(diff ** 2)
+    return calculate_brenner_sharpness_arr(_load_gray(image_path))
+
+def calculate_brenner_sharpness_arr(image):
+    # BrennerQC's single-pass parallel kernel (compiled extension or Numba when available)
+    return _brenner_arr(image)
 
 def calculate_tenengrad_sharpness(image_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    sobel_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
-    sobel_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
-    magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
-    return np.sum(magnitude**2)
+    return calculate_tenengrad_sharpness_arr(_load_gray(image_path))
+
+def calculate_tenengrad_sharpness_arr(image):
+    # TenengradQC's fused single-pass sum of Gx^2 + Gy^2 (Numba when available)
+    return _tenengrad_arr(image)
 
 def calculate_gabor_variance(image_path, ksize=31, sigma=4.0, theta=0, lambd=10.0, gamma=0.5, psi=0):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    gabor_kernel = cv2.getGaborKernel((ksize, ksize), sigma, theta, lambd, gamma, psi, ktype=cv2.CV_64F)
-    filtered = cv2.filter2D(image, cv2.CV_64F, gabor_kernel)
-    return np.var(filtered)
+    return calculate_gabor_variance_arr(_load_gray(image_path), ksize, sigma, theta, lambd, gamma, psi)
+
+def calculate_gabor_variance_arr(image, ksize=31, sigma=4.0, theta=0, lambd=10.0, gamma=0.5, psi=0):
+    # GabVarQC runs the axis-aligned kernel as two separable 1-D passes
+    return _gabor_arr(image, ksize, sigma, theta, lambd, gamma, psi)
 
 def get_metrics(image_path):
+    # Decode once and compute all four metrics from the same grayscale buffer
+    return get_metrics_arr(_load_gray(image_path))
+
+def get_metrics_arr(image):
     return [
-        calculate_laplacian_sharpness(image_path),
-        calculate_brenner_sharpness(image_path),
-        calculate_tenengrad_sharpness(image_path),
-        calculate_gabor_variance(image_path)
+        calculate_laplacian_sharpness_arr(image),
+        calculate_brenner_sharpness_arr(image),
+        calculate_tenengrad_sharpness_arr(image),
+        calculate_gabor_variance_arr(image)
     ]
 
 if __name__ == "__main__":
@@ -64,8 +76,12 @@ if __name__ == "__main__":
 
         metrics_names = ["Laplacian Value", "Brenner Value", "Tenengrad Value", "Gabor Variance"]
 
-        ref_metrics = get_metrics(ref_path)
-        comp_metrics = get_metrics(comp_path)
+        # Decode the comparison image on a background thread while the reference
+        # is being measured (OpenCV releases the GIL while decoding)
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            comp_image = prefetch.submit(_load_gray, comp_path)
+            ref_metrics = get_metrics(ref_path)
+            comp_metrics = get_metrics_arr(comp_image.result())
 
         print(f"{'Metric':<20} {ref_filename:<15} {comp_filename:<15}")
         for name, ref, comp in zip(metrics_names, ref_metrics, comp_metrics):
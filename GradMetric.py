@@ -5,10 +5,59 @@
 # distribution. A higher value suggests a more even distribution of tones and,
 # generally, better tonal graduation.
 
-import cv2
-import numpy as np
+import math
 import os
 import glob
+import multiprocessing
+from PIL import Image
+
+def _histogram_entropy_py(image):
+    """
+    Shannon entropy (bits) of a PIL image's histogram, for Pillow versions without
+    Image.entropy(). Works on the 256 counts with math.fsum/math.log2 only.
+    """
+    n = image.width * image.height
+    return -math.fsum(c / n * math.log2(c / n) for c in image.histogram() if c)
+
+# Pillow >= 6.1 computes the histogram entropy natively in C
+histogram_entropy = getattr(Image.Image, 'entropy', _histogram_entropy_py)
+
+def quadratic_entropy(histogram, sigma=8.0):
+    """
+    Renyi quadratic entropy (nats) of a 256-bin histogram with a Gaussian Parzen
+    window: H2 = -log(sum over i, j of p_i * p_j * G(i - j; 2 * sigma^2)). The Gaussian
+    smooths over neighbouring bins, so the score is less sensitive to sparse or
+    combed histograms than the Shannon entropy.
+
+    Args:
+        histogram (list): Pixel counts per intensity level.
+        sigma (float): Parzen window width in intensity levels.
+
+    Returns:
+        float: The quadratic entropy.
+    """
+    n = sum(histogram)
+    p = [c / n for c in histogram]
+    # The pairwise kernel has variance 2*sigma^2; truncate it at 3 standard deviations
+    k = math.ceil(3 * math.sqrt(2) * sigma)
+    norm = math.sqrt(4 * math.pi * sigma * sigma)
+    g = [math.exp(-d * d / (4 * sigma * sigma)) / norm for d in range(-k, k + 1)]
+    # Correlate p with the short kernel over the non-empty bins only
+    information_potential = math.fsum(
+        p[i] * p[j] * g[j - i + k]
+        for i in range(len(p)) if p[i]
+        for j in range(max(0, i - k), min(len(p), i + k + 1)) if p[j]
+    )
+    return -math.log(information_potential)
+
+def _load_gray(image_path):
+    try:
+        with Image.open(image_path) as image:
+            # For JPEGs, ask the decoder for grayscale directly so chroma is never decoded
+            image.draft('L', image.size)
+            return image.convert('L')
+    except OSError:
+        raise FileNotFoundError(f"Image not found at path: {image_path}")
 
 def calculate_histogram_entropy(image_path):
     """
@@ -23,22 +72,38 @@ def calculate_histogram_entropy(image_path):
     Raises:
         FileNotFoundError: If the image file is not found.
     """
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise FileNotFoundError(f"Image not found at path: {image_path}")
+    gray = _load_gray(image_path)
 
-    # Calculate the histogram of the grayscale image
-    hist, _ = np.histogram(image.ravel(), 256, [0, 256])
+    # Entropy of the 256-bin histogram: $H = - \sum_{i} p_i \log_2(p_i)$ over the
+    # non-empty bins, computed natively by Pillow
+    return histogram_entropy(gray)
 
-    # Normalize the histogram to get probability distribution
-    hist_norm = hist / hist.sum()
+def calculate_quadratic_entropy(image_path, sigma=8.0):
+    """
+    Calculates the Gaussian-smoothed quadratic entropy of a grayscale image's
+    histogram, a bin-noise-robust alternative to calculate_histogram_entropy.
 
-    # Calculate entropy using the formula: $H = - \sum_{i} p_i \log_2(p_i)$
-    # Avoid log(0) by filtering out zero probabilities.
-    probabilities = hist_norm[hist_norm > 0]
-    entropy = -np.sum(probabilities * np.log2(probabilities))
+    Args:
+        image_path (str): The full path to the input image file.
+        sigma (float): Smoothing width in intensity levels.
 
-    return entropy
+    Returns:
+        float: The quadratic entropy in nats. Higher means a wider, more even tonal spread.
+
+    Raises:
+        FileNotFoundError: If the image file is not found.
+    """
+    return quadratic_entropy(_load_gray(image_path).histogram(), sigma)
+
+def _process_one(img_path):
+    """
+    Worker for the batch run: scores one image, returning the error instead
+    of raising so one bad file doesn't stop the pool.
+    """
+    try:
+        return img_path, calculate_histogram_entropy(img_path), None
+    except Exception as e:
+        return img_path, None, e
 
 if __name__ == "__main__":
     # Define the directory where your images are located
@@ -52,14 +117,16 @@ if __name__ == "__main__":
     else:
         print(f"Found {len(image_files)} image(s) to analyze.")
         print("---")
-        for img_path in image_files:
-            file_name = os.path.basename(img_path)
-            
-            try:
-                entropy_score = calculate_histogram_entropy(img_path)
-                
+
+        # Each image is independent, so decode and score them on all cores
+        # (spawned workers, as in the other batch scripts)
+        with multiprocessing.get_context("spawn").Pool() as pool:
+            for img_path, entropy_score, error in pool.imap_unordered(_process_one, image_files, chunksize=4):
+                file_name = os.path.basename(img_path)
+                if error is not None:
+                    print(f"An error occurred while processing {file_name}: {error}")
+                    continue
+
                 print(f"Image: {file_name}")
                 print(f"  Histogram Entropy = {entropy_score:.2f}")
                 print("---")
-            except Exception as e:
-                print(f"An error occurred while processing {file_name}: {e}")
@@ -1,9 +1,7 @@
-import cv2
 import os
 import sys
-import piexif
 from PIL import Image
-from image_utils import get_qc_image_path
+from image_utils import get_qc_image_path, read_exif_summary
 
 def get_image_statistics(image_path):
     """
@@ -18,20 +16,19 @@ def get_image_statistics(image_path):
         sys.stdout.write(f"Error: The image file was not found at {image_path}\n")
         sys.exit(1) # Exit cleanly with an error code
 
-    # Open image with OpenCV for dimensions and with PIL for other attributes
-    cv2_image = cv2.imread(image_path)
-    if cv2_image is None:
-        sys.stdout.write("Error: Could not load the image with OpenCV. Check file integrity or format.\n")
-        sys.exit(1)
-        
+    # Open the image with PIL; this only parses the header, so the size, mode
+    # and EXIF block are available without decoding any pixel data. Read them
+    # all up front and close the file.
     try:
-        pil_image = Image.open(image_path)
+        with Image.open(image_path) as pil_image:
+            width, height = pil_image.size
+            color_space = pil_image.mode
+            camera_model, exposure_time, iso = read_exif_summary(pil_image)
     except IOError as e:
         sys.stdout.write(f"Error: Could not open the image with Pillow. {e}\n")
         sys.exit(1)
         
     # Get basic image attributes
-    width, height = pil_image.size
     megapixels = (width * height) / 1000000.0
 
     # Determine the original MP rating and apply the "HR" label if applicable
@@ -47,8 +44,7 @@ def get_image_statistics(image_path):
 
     file_size_kb = os.path.getsize(image_path) / 1024.0
     
-    # Get color space and bit depth
-    color_space = pil_image.mode
+    # Get bit depth from the color space
     if 'L' in color_space:
         bit_depth = 8 # Grayscale
     elif 'RGB' in color_space:
@@ -56,24 +52,6 @@ def get_image_statistics(image_path):
     else:
         bit_depth = "unknown"
 
-    # Get EXIF data
-    try:
-        exif_dict = piexif.load(image_path)
-        camera_model = exif_dict.get("0th", {}).get(piexif.ImageIFD.Make)
-        if camera_model:
-            camera_model = camera_model.decode('utf-8')
-        
-        exposure_time = exif_dict.get("Exif", {}).get(piexif.ExifIFD.ExposureTime)
-        if exposure_time and len(exposure_time) == 2:
-            exposure_time = f"{exposure_time[0]}/{exposure_time[1]} sec"
-            
-        iso = exif_dict.get("Exif", {}).get(piexif.ExifIFD.ISOSpeedRatings)
-
-    except (KeyError, piexif.InvalidImageDataError, piexif.NoExifDataError):
-        camera_model = "N/A"
-        exposure_time = "N/A"
-        iso = "N/A"
-        
     # Print the output in a single column
     sys.stdout.write(f"filenames = {os.path.basename(image_path)}\n")
     sys.stdout.write(f"pixel dimensions = {width}x{height}\n")
@@ -89,10 +67,7 @@ def get_image_statistics(image_path):
 # --- Main part of the script ---
 if __name__ == "__main__":
     try:
-        folder_name = "QCImages"
         image_path = get_qc_image_path()
-        image_path = os.path.join(folder_name, file_name)
-    
         get_image_statistics(image_path)
     except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
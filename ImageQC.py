@@ -1,29 +1,39 @@
 import cv2
+import glob
+import io
+import multiprocessing
 import os
 import sys
-import piexif
 import numpy as np
 from PIL import Image
-from scipy import fftpack, ndimage
-from skimage import filters
-from image_utils import get_qc_image_path
+from scipy import fft as sp_fft
+from image_utils import read_exif_summary
+from color_utils import luminance_histogram
+from BrennerQC import calculate_brenner_sharpness_arr as _brenner_arr
 
-# --- Image Path ---
-try:
-    image_path = get_qc_image_path()
-except (FileNotFoundError, ValueError) as e:
-    print(f"Error loading image: {e}")
-    sys.exit(1)
+# Orthonormal 8-point DCT-II matrix (the transform cv2.dct applies), so the 2-D DCT
+# of an 8x8 block B is DCT_8 @ B @ DCT_8.T
+DCT_8 = cv2.dct(np.eye(8, dtype=np.float32), flags=cv2.DCT_ROWS).T
+
+# Diagonal Gabor kernel for calculate_gabor_variance, built once rather than on every call
+GABOR_KERNEL = cv2.getGaborKernel((21, 21), 8.0, np.pi/4, 10.0, 0.5, 0, ktype=cv2.CV_32F)
 
 # --- Image Statistics ---
-def get_image_statistics(image_path):
-    if not os.path.exists(image_path):
+def get_image_statistics(image_path, data=None):
+    """
+    File attributes and EXIF summary. Pass the file's bytes as `data` when they
+    have already been read (e.g. for decoding) so the file isn't opened again.
+    """
+    if data is None and not os.path.exists(image_path):
         print(f"Error: Image not found at {image_path}")
         return {}
 
-    cv2_image = cv2.imread(image_path)
-    pil_image = Image.open(image_path)
-    width, height = pil_image.size
+    # PIL only parses the header here; the pixel data is never decoded. Read
+    # everything needed up front and close the image.
+    with Image.open(io.BytesIO(data) if data is not None else image_path) as pil_image:
+        width, height = pil_image.size
+        color_space = pil_image.mode
+        camera_model, exposure_time, iso = read_exif_summary(pil_image)
     megapixels = (width * height) / 1_000_000.0
 
     if 75 < megapixels < 85:
@@ -35,20 +45,9 @@ def get_image_statistics(image_path):
     else:
         original_mp_label = "Other"
 
-    file_size_kb = os.path.getsize(image_path) / 1024.0
-    color_space = pil_image.mode
+    file_size_kb = (len(data) if data is not None else os.path.getsize(image_path)) / 1024.0
     bit_depth = 8 if color_space == 'L' else 24 if color_space == 'RGB' else 32 if color_space == 'RGBA' else "unknown"
 
-    try:
-        exif_dict = piexif.load(image_path)
-        camera_model = exif_dict.get("0th", {}).get(piexif.ImageIFD.Make)
-        camera_model = camera_model.decode('utf-8') if camera_model else "N/A"
-        exposure_time = exif_dict.get("Exif", {}).get(piexif.ExifIFD.ExposureTime)
-        exposure_time = f"{exposure_time[0]}/{exposure_time[1]} sec" if exposure_time else "N/A"
-        iso = exif_dict.get("Exif", {}).get(piexif.ExifIFD.ISOSpeedRatings) or "N/A"
-    except Exception:
-        camera_model = exposure_time = iso = "N/A"
-
     return {
         "filename": os.path.basename(image_path),
         "dimensions": f"{width}x{height}",
@@ -63,21 +62,27 @@ def get_image_statistics(image_path):
     }
 
 # --- Analysis Functions ---
-def analyze_tonal_distribution(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    hist = cv2.calcHist([gray], [0], None, [256], [0,256])
-    return {"tonal_distribution": hist.flatten().tolist()}
+# Functions taking `gray` expect the grayscale image; it is converted once in the
+# main block and shared, rather than every metric converting the BGR image again.
+def analyze_tonal_distribution(gray):
+    # One bin per uint8 value is a plain count: a single parallel pass, with none of
+    # calcHist's general range handling
+    hist = luminance_histogram(gray)
+    return {"tonal_distribution": hist.tolist()}
 
-def analyze_noise(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    noise = np.std(gray - cv2.GaussianBlur(gray, (3,3), 0))
-    return {"noise_std_dev": round(noise, 4)}
+def analyze_noise(gray):
+    # Signed residual in int16, so pixels darker than their blur don't wrap around
+    residual = cv2.subtract(gray, cv2.GaussianBlur(gray, (3,3), 0), dtype=cv2.CV_16S)
+    _, std = cv2.meanStdDev(residual)
+    return {"noise_std_dev": round(float(std[0, 0]), 4)}
 
 def analyze_chromatic_aberration(image):
     b, g, r = cv2.split(image)
     diff_rg = cv2.absdiff(r, g)
     diff_gb = cv2.absdiff(g, b)
-    aberration_score = np.mean(diff_rg + diff_gb)
+    # mean(|R-G| + |G-B|) as the sum of the two means: no summed array, and no
+    # uint8 overflow where the two differences add up past 255
+    aberration_score = cv2.mean(diff_rg)[0] + cv2.mean(diff_gb)[0]
     return {"chromatic_aberration_score": round(aberration_score, 4)}
 
 def analyze_lens_distortion(image):
@@ -85,21 +90,29 @@ def analyze_lens_distortion(image):
     distortion_score = np.mean(edges)
     return {"lens_distortion_score": round(distortion_score, 4)}
 
-def analyze_vignetting(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+def analyze_vignetting(gray):
     center = gray[gray.shape[0]//4:3*gray.shape[0]//4, gray.shape[1]//4:3*gray.shape[1]//4]
     vignetting_score = np.mean(center) / np.mean(gray)
     return {"vignetting_score": round(vignetting_score, 4)}
 
-def analyze_compression_artifacts(image):
-    dct = cv2.dct(np.float32(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)))
-    artifact_score = np.mean(np.abs(dct))
+def analyze_compression_artifacts(gray):
+    # DCT of each 8x8 block on the JPEG grid, where compression artifacts live,
+    # rather than one transform of the whole image. Partial blocks at the right
+    # and bottom edges are dropped.
+    h, w = gray.shape
+    h8, w8 = h - h % 8, w - w % 8
+    if h8 == 0 or w8 == 0:
+        return {"compression_artifact_score": 0.0}
+    blocks = np.float32(gray[:h8, :w8]).reshape(h8 // 8, 8, w8 // 8, 8).swapaxes(1, 2)
+    # Two batched 8x8 matrix products over all blocks at once
+    dct = DCT_8 @ blocks @ DCT_8.T
+    artifact_score = float(np.mean(np.abs(dct), dtype=np.float64))
     return {"compression_artifact_score": round(artifact_score, 4)}
 
-def calculate_brenner_sharpness(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    shifted = np.roll(gray, -1, axis=0)
-    brenner = np.sum((gray - shifted)**2)
+def calculate_brenner_sharpness(gray):
+    # Sum of squared differences between pixels two rows apart, in one fused
+    # parallel loop with no temporaries (BrennerQC's kernel)
+    brenner = _brenner_arr(gray)
     return {"brenner_sharpness": round(brenner, 4)}
 
 def count_canny_edges(image):
@@ -114,58 +127,83 @@ def calculate_colorfulness_metric(image):
     mean_root = np.sqrt(np.mean(rg)**2 + np.mean(yb)**2)
     return {"colorfulness": round(std_root + 0.3 * mean_root, 4)}
 
-def calculate_fft_sharpness(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    f = fftpack.fft2(gray)
-    fshift = fftpack.fftshift(f)
-   _spectrum = 20 * np.log(np.abs(fshift))
-    return {"fft_sharpness": round(np.mean(magnitude_spectrum), 4)}
+def calculate_fft_sharpness(gray):
+    # A real image's spectrum is conjugate-symmetric, so the real FFT's half spectrum
+    # holds every magnitude: each column stands for itself and its mirror, except
+    # column 0 and (for even widths) the Nyquist column, which are their own mirrors.
+    # The mean doesn't depend on the ordering, so no fftshift either.
+    log_mag = np.log(np.abs(sp_fft.rfft2(gray, workers=-1)))
+    total = 2 * log_mag.sum(dtype=np.float64) - log_mag[:, 0].sum(dtype=np.float64)
+    if gray.shape[1] % 2 == 0:
+        total -= log_mag[:, -1].sum(dtype=np.float64)
+    return {"fft_sharpness": round(20 * total / gray.size, 4)}
 
-def calculate_gabor_variance(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gabor_kernel = cv2.getGaborKernel((21, 21), 8.0, np.pi/4, 10.0, 0.5, 0, ktype=cv2.CV_32F)
-    filtered = cv2.filter2D(gray, cv2.CV_8UC3, gabor_kernel)
-    return {"gabor_variance": round(np.var(filtered), 4)}
+def calculate_gabor_variance(gray):
+    filtered = cv2.filter2D(gray, cv2.CV_8UC3, GABOR_KERNEL)
+    _, std = cv2.meanStdDev(filtered)
+    return {"gabor_variance": round(float(std[0, 0]) ** 2, 4)}
 
-def calculate_gradient_metric(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-   _x = cv2.Sobel(gray, cv2.CV_64F, 1, 0)
-    grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1)
-    gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2)
-    return {"gradient_metric": round(np.mean(gradient_magnitude), 4)}
+def sobel_stats(gray):
+    """
+    One 3x3 Sobel pass shared by the gradient, Sobel and Tenengrad metrics.
+    Returns the mean gradient magnitude and the mean squared magnitude.
+    """
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1)
+    mean_mag = float(np.mean(cv2.magnitude(gx, gy), dtype=np.float64))
+    # Sum of squares accumulated in double precision by cv2.norm
+    mean_mag_sq = (cv2.norm(gx, cv2.NORM_L2SQR) + cv2.norm(gy, cv2.NORM_L2SQR)) / gray.size
+    return {"mean_magnitude": mean_mag, "mean_magnitude_sq": mean_mag_sq}
 
-def calculate_local_variance(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    local_var = ndimage.generic_filter(gray, np.var, size=5)
-    return {"local_variance": round(np.mean(local_var), 4)}
+def calculate_gradient_metric(gray, stats=None):
+    stats = stats or sobel_stats(gray)
+    return {"gradient_metric": round(stats["mean_magnitude"], 4)}
 
-def calculate_noise_metric(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    noise_metric = np.var(gray - cv2.medianBlur(gray, 3))
-    return {"noise_metric": round(noise_metric, 4)}
+def calculate_local_variance(gray):
+    # Windowed variance as E[x^2] - E[x]^2 over 5x5 windows: two separable box
+    # filters instead of a Python np.var callback per pixel. BORDER_REFLECT matches
+    # scipy's 'reflect' mode.
+    g = gray.astype(np.float32)
+    mean = cv2.boxFilter(g, -1, (5, 5), borderType=cv2.BORDER_REFLECT)
+    mean_sq = cv2.boxFilter(g * g, -1, (5, 5), borderType=cv2.BORDER_REFLECT)
+    local_var = mean_sq - mean * mean
+    return {"local_variance": round(float(local_var.mean(dtype=np.float64)), 4)}
 
-def calculate_normalized_average_gradient(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    grad = np.gradient(gray.astype("float"))
-    mag = np.sqrt(grad[0]**2 + grad[1]**2)
-    return {"normalized_avg_gradient": round(np.mean(mag) / 255.0, 4)}
+def calculate_noise_metric(gray):
+    # Signed residual: a uint8 difference would wrap negative values around to 255
+    residual = cv2.subtract(gray, cv2.medianBlur(gray, 3), dtype=cv2.CV_16S)
+    _, std = cv2.meanStdDev(residual)
+    return {"noise_metric": round(float(std[0, 0]) ** 2, 4)}
 
-def calculate_sobel_sharpness(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    sobel = filters.sobel(gray)
-    return {"sobel_sharpness": round(np.mean(sobel), 4)}
+def calculate_normalized_average_gradient(gray):
+    # Central differences (x[i+1] - x[i-1]) / 2 as OpenCV's unsmoothed 3-tap
+    # derivative, read straight from the uint8 image
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=1, scale=0.5)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=1, scale=0.5)
+    # np.gradient's one-sided differences on the outer rows and columns
+    # (in NumPy: OpenCV would read a column of 4 or fewer pixels as a Scalar)
+    if gray.shape[1] > 1:
+        gx[:, 0] = gray[:, 1].astype(np.float32) - gray[:, 0]
+        gx[:, -1] = gray[:, -1].astype(np.float32) - gray[:, -2]
+    if gray.shape[0] > 1:
+        gy[0] = gray[1].astype(np.float32) - gray[0]
+        gy[-1] = gray[-1].astype(np.float32) - gray[-2]
+    mag = cv2.magnitude(gx, gy)
+    return {"normalized_avg_gradient": round(float(np.mean(mag, dtype=np.float64)) / 255.0, 4)}
 
-def calculate_tenengrad_metric(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gx = cv2.Sobel(gray, cv2.CV_64F, 1, 0)
-    gy = cv2.Sobel(gray, cv2.CV_64F, 0, 1)
-    fm = gx**2 + gy**2
-    return {"tenengrad_metric": round(np.mean(fm), 4)}
+def calculate_sobel_sharpness(gray, stats=None):
+    stats = stats or sobel_stats(gray)
+    # skimage.filters.sobel's scale: kernels normalised by 1/4, the magnitude
+    # divided by sqrt(2), on an image in [0, 1]
+    return {"sobel_sharpness": round(stats["mean_magnitude"] / (4 * np.sqrt(2) * 255.0), 4)}
 
-def calculate_wavelet_sharpness(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    coeffs = fftpack.dct(gray.astype("float"))
-    return {"wavelet_sharpness": round(np.mean(np.abs(coeffs)), 4)}
+def calculate_tenengrad_metric(gray, stats=None):
+    stats = stats or sobel_stats(gray)
+    return {"tenengrad_metric": round(stats["mean_magnitude_sq"], 4)}
+
+def calculate_wavelet_sharpness(gray):
+    coeffs = sp_fft.dct(gray.astype(np.float32), workers=-1)
+    return {"wavelet_sharpness": round(float(np.mean(np.abs(coeffs), dtype=np.float64)), 4)}
 
 def analyze_color_accuracy_and_white_balance(image):
     avg_color_per_row = np.mean(image, axis=0)
@@ -176,35 +214,85 @@ def analyze_color_accuracy_and_white_balance(image):
         "avg_blue": round(avg_colors[0], 2)
     }
 
-# --- Main Execution ---
-if __name__ == "__main__":
-    image = cv2.imread(image_path)
+# --- Per-Image Pipeline ---
+def analyze_image(image_path):
+    """
+    Runs every analysis on one image and returns the combined results dict.
+    The file is read once and decoded once; the grayscale image and the Sobel
+    pass are computed once and shared.
+
+    Raises:
+        FileNotFoundError: If the image can't be read or decoded.
+    """
+    # Read the file once: the same bytes feed the pixel decode and the header parse
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        raise FileNotFoundError(f"Image not found at path: {image_path}")
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
     if image is None:
-        print("Error: Unable to load image.")
-        sys.exit(1)
+        raise FileNotFoundError(f"Unable to load image: {image_path}")
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    gradients = sobel_stats(gray)
 
     results = {}
-    results.update(get_image_statistics(image_path))
-    results.update(analyze_tonal_distribution(image))
-    results.update(analyze_noise(image))
+    results.update(get_image_statistics(image_path, data))
+    results.update(analyze_tonal_distribution(gray))
+    results.update(analyze_noise(gray))
     results.update(analyze_chromatic_aberration(image))
     results.update(analyze_lens_distortion(image))
-    results.update(analyze_vignetting(image))
-    results.update(analyze_compression_artifacts(image))
-    results.update(calculate_brenner_sharpness(image))
+    results.update(analyze_vignetting(gray))
+    results.update(analyze_compression_artifacts(gray))
+    results.update(calculate_brenner_sharpness(gray))
     results.update(count_canny_edges(image))
     results.update(calculate_colorfulness_metric(image))
-    results.update(calculate_fft_sharpness(image))
-    results.update(calculate_gabor_variance(image))
-    results.update(calculate_gradient_metric(image))
-    results.update(calculate_local_variance(image))
-    results.update(calculate_noise_metric(image))
-    results.update(calculate_normalized_average_gradient(image))
-    results.update(calculate_sobel_sharpness(image))
-    results.update(calculate_tenengrad_metric(image))
-    results.update(calculate_wavelet_sharpness(image))
+    results.update(calculate_fft_sharpness(gray))
+    results.update(calculate_gabor_variance(gray))
+    results.update(calculate_gradient_metric(gray, gradients))
+    results.update(calculate_local_variance(gray))
+    results.update(calculate_noise_metric(gray))
+    results.update(calculate_normalized_average_gradient(gray))
+    results.update(calculate_sobel_sharpness(gray, gradients))
+    results.update(calculate_tenengrad_metric(gray, gradients))
+    results.update(calculate_wavelet_sharpness(gray))
     results.update(analyze_color_accuracy_and_white_balance(image))
+    return results
+
+def _process_one(img_path):
+    """
+    Worker for the batch run: analyzes one image, returning the error instead
+    of raising so one bad file doesn't stop the pool.
+    """
+    try:
+        return img_path, analyze_image(img_path), None
+    except Exception as e:
+        return img_path, None, e
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    image_directory = "QCImages"
+    image_files = sorted(
+        path
+        for ext in ('*.tif', '*.tiff', '*.png', '*.jpg', '*.jpeg')
+        for path in glob.glob(os.path.join(image_directory, ext))
+    )
+
+    if not image_files:
+        print(f"No image files found in the '{image_directory}' directory.")
+        sys.exit(1)
+
+    print(f"Found {len(image_files)} image(s) to analyze.")
+
+    # Each image runs its whole pipeline independently, so spread the images over
+    # all cores. Workers are spawned rather than forked: forking after the Numba
+    # Brenner kernel's thread pool has started can deadlock the children.
+    with multiprocessing.get_context("spawn").Pool() as pool:
+        for img_path, results, error in pool.imap_unordered(_process_one, image_files, chunksize=2):
+            if error is not None:
+                print(f"An error occurred while processing {os.path.basename(img_path)}: {error}")
+                continue
 
-    print("\n--- Image Quality Analysis Report ---")
-    for key, value in results.items():
-        print(f"{key}: {value}")
+            print("\n--- Image Quality Analysis Report ---")
+            for key, value in results.items():
+                print(f"{key}: {value}")
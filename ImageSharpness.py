@@ -20,7 +20,9 @@ def analyze_sharpness(image_path: str):
 
         # Calculate the Laplacian of the image
         # The Laplacian highlights regions of rapid intensity change (i.e., edges)
-        laplacian_var = cv2.Laplacian(img, cv2.CV_64F).var()
+        # float32 is exact for an 8-bit image; meanStdDev accumulates in double
+        _, std = cv2.meanStdDev(cv2.Laplacian(img, cv2.CV_32F))
+        laplacian_var = std[0, 0] ** 2
 
         print(f"Sharpness Score (Laplacian Variance): {laplacian_var:.2f}")
 
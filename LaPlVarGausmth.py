@@ -25,19 +25,18 @@ def calculate_laplacian_sharpness(image_path, kernel_size=(5, 5), sigma=0):
     # Apply Gaussian smoothing
     smoothed_image = cv2.GaussianBlur(image, kernel_size, sigma)
 
-    # Compute Laplacian and calculate variance
-    laplacian = cv2.Laplacian(smoothed_image, cv2.CV_64F)
-    variance = laplacian.var()
+    # Compute Laplacian (exact in float32 for 8-bit input) and calculate its
+    # variance in a single pass, accumulated in double precision
+    laplacian = cv2.Laplacian(smoothed_image, cv2.CV_32F)
+    _, std = cv2.meanStdDev(laplacian)
+    variance = float(std[0, 0]) ** 2
 
     return variance
 
 # --- Main part of the script ---
 if __name__ == "__main__":
-    folder_name = "QCImages"
-    image_path = get_qc_image_path()
-    image_path = os.path.join(folder_name, file_name)
-
     try:
+        image_path = get_qc_image_path()
         sharpness_score = calculate_laplacian_sharpness(image_path)
         print(f"Laplacian sharpness score (with Gaussian smoothing): {sharpness_score:.2f}")
     except Exception as e:
@@ -7,8 +7,9 @@ def calculate_laplacian_sharpness(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
 
     # Compute Laplacian
-    laplacian = cv2.Laplacian(image, cv2.CV_64F)
-    variance = laplacian.var()
+    laplacian = cv2.Laplacian(image, cv2.CV_32F)
+    _, std = cv2.meanStdDev(laplacian)
+    variance = std[0, 0] ** 2
 
     return variance
 
@@ -26,8 +26,10 @@ def calculate_laplacian_sharpness(image_path):
         raise ValueError("Error: Could not load the image. Check file integrity.")
 
     # Apply the Laplacian filter and calculate the variance
-    # cv2.CV_64F is used for high precision to avoid data loss
-    laplacian_var = cv2.Laplacian(image, cv2.CV_64F).var()
+    # cv2.CV_32F holds the Laplacian of an 8-bit image exactly; meanStdDev
+    # accumulates the variance in double precision
+    _, std = cv2.meanStdDev(cv2.Laplacian(image, cv2.CV_32F))
+    laplacian_var = std[0, 0] ** 2
 
     return laplacian_var
 
@@ -3,6 +3,78 @@ import cv2
 import numpy as np
 from image_utils import get_qc_image_path
 
+# How far (in pixels) either side of a line segment to search for the curved edge
+SAGITTA_SEARCH = 10
+# Bowing is a low-frequency signal, so edges are found on a copy no larger than this
+ANALYSIS_MAX_DIM = 1024
+
+def calculate_lens_distortion_arr(img):
+    """
+    Average signed bowing of the straight edges in an already-decoded grayscale image.
+
+    Args:
+        img (ndarray): uint8 grayscale image.
+
+    Returns:
+        float: Mean signed sagitta in full-resolution pixels (positive pincushion, negative barrel),
+            or None if no straight lines could be measured.
+    """
+    # Halve the image until it fits ANALYSIS_MAX_DIM: Canny and Hough cost scale
+    # with the pixel and edge counts, and the sagitta is scaled back to full-size
+    # pixels at the end
+    scale = 1
+    while max(img.shape[:2]) > ANALYSIS_MAX_DIM:
+        img = cv2.pyrDown(img)
+        scale *= 2
+
+    # Use Canny edge detection to find edges
+    edges = cv2.Canny(img, 50, 150, apertureSize=3)
+    
+    # Use Hough Lines Probabilistic Transform to find straight lines
+    # This is more robust than the standard Hough transform
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=100, maxLineGap=10)
+
+    if lines is None:
+        return None
+
+    # All segments at once as (N,) arrays
+    x1, y1, x2, y2 = lines.reshape(-1, 4).astype(np.float32).T
+    center_x, center_y = img.shape[1] / 2, img.shape[0] / 2
+
+    # Calculate the midpoints of the lines
+    mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
+
+    # Unit normal of each segment. A segment's own midpoint always lies on the
+    # segment, so the bowing has to be measured against the edge itself: on a
+    # curved edge the detected segment is a chord, and the edge at the chord's
+    # midpoint is offset from it along the normal (the sagitta).
+    length = np.hypot(x2 - x1, y2 - y1)
+    normal_x, normal_y = -(y2 - y1) / length, (x2 - x1) / length
+
+    # Look for the nearest edge pixel along the normal, up to SAGITTA_SEARCH px either side
+    offsets = np.arange(-SAGITTA_SEARCH, SAGITTA_SEARCH + 1, dtype=np.float32)
+    sample_x = np.rint(mid_x[:, None] + offsets * normal_x[:, None]).astype(np.intp)
+    sample_y = np.rint(mid_y[:, None] + offsets * normal_y[:, None]).astype(np.intp)
+    np.clip(sample_x, 0, img.shape[1] - 1, out=sample_x)
+    np.clip(sample_y, 0, img.shape[0] - 1, out=sample_y)
+    hits = edges[sample_y, sample_x] > 0
+    found = hits.any(axis=1)
+    nearest = np.argmin(np.where(hits, np.abs(offsets), np.inf), axis=1)
+    sagitta = offsets[nearest][found] * scale
+
+    if sagitta.size == 0:
+        return None
+
+    # The sign of the dot product between the normal and the vector from the
+    # image center to the midpoint tells which side of the chord faces away from
+    # the center. Edges bowing away from the center are barrel (negative),
+    # towards it pincushion (positive).
+    outward = np.sign((mid_x - center_x) * normal_x + (mid_y - center_y) * normal_y)[found]
+    distortion_scores = -sagitta * outward
+
+    # Calculate the average distortion score
+    return float(np.mean(distortion_scores))
+
 def analyze_lens_distortion(image_path):
     """
     Analyzes an image for lens distortion (barrel or pincushion).
@@ -19,67 +91,11 @@ def analyze_lens_distortion(image_path):
         print(f"✅ Successfully loaded image: {image_path}")
         print("\n--- Lens Distortion Analysis ---")
 
-        # Use Canny edge detection to find edges
-        edges = cv2.Canny(img, 50, 150, apertureSize=3)
-        
-        # Use Hough Lines Probabilistic Transform to find straight lines
-        # This is more robust than the standard Hough transform
-        lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=100, maxLineGap=10)
-
-        if lines is None:
+        avg_distortion = calculate_lens_distortion_arr(img)
+        if avg_distortion is None:
             print("❌ No significant straight lines found to analyze distortion.")
             return
 
-        # Initialize variables for distortion calculation
-        distortion_scores = []
-        center_x, center_y = img.shape[1] / 2, img.shape[0] / 2
-
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-
-            # Calculate the midpoints of the line
-            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-
-            # Calculate the distance of the midpoint from the line connecting the endpoints
-            # This is a proxy for how much the line segment is bowed
-            
-            # Equation of the line: ax + by + c = 0
-            a = y2 - y1
-            b = x1 - x2
-            c = x2 * y1 - x1 * y2
-
-            # Distance formula for a point (mid_x, mid_y) to a line (ax + by + c = 0)
-            distance = abs(a * mid_x + b * mid_y + c) / np.sqrt(a**2 + b**2)
-            
-            # The sign of the distance can tell us the type of distortion
-            # We can use the cross-product to determine the direction of the curve
-            # If the line bows away from the center, it's barrel. Towards, it's pincushion.
-            
-            # Vector from center to midpoint of line
-            vec_center_to_mid = (mid_x - center_x, mid_y - center_y)
-            
-            # Vector of the line itself
-            vec_line = (x2 - x1, y2 - y1)
-            
-            # Find a perpendicular vector to the line
-            vec_perp = (-vec_line[1], vec_line[0])
-
-            # The sign of the dot product indicates the direction of curvature
-            dot_product = vec_center_to_mid[0] * vec_perp[0] + vec_center_to_mid[1] * vec_perp[1]
-            
-            # A positive dot product implies pincushion, negative implies barrel
-            distortion_type = 1 if dot_product > 0 else -1
-            
-            # Append the signed distance to the list
-            distortion_scores.append(distance * distortion_type)
-        
-        if not distortion_scores:
-            print("❌ No distortion metric could be calculated from the detected lines.")
-            return
-
-        # Calculate the average distortion score
-        avg_distortion = np.mean(distortion_scores)
-        
         # A simple normalization by image width
         normalized_score = abs(avg_distortion) / img.shape[1] * 100
         
@@ -101,6 +117,7 @@ if __name__ == "__main__":
     try:
         # Define the fixed image path
         image_file = get_qc_image_path()
-        analyze_lens_distortion(image_file)    except (FileNotFoundError, ValueError) as e:
+        analyze_lens_distortion(image_file)
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
\ No newline at end of file
@@ -1,5 +1,4 @@
 import cv2
-import numpy as np
 from image_utils import get_qc_image_path
 
 def compute_local_variance(image_path, window_size=7):
@@ -18,21 +17,34 @@ def compute_local_variance(image_path, window_size=7):
     if image is None:
         raise ValueError("Image not found or unable to load.")
 
-    # Convert to float for precision
-    image = image.astype(np.float32)
+    return compute_local_variance_arr(image, window_size)
 
-    # Compute local mean
-    kernel = np.ones((window_size, window_size), np.float32) / (window_size ** 2)
-    local_mean = cv2.filter2D(image, -1, kernel)
+def compute_local_variance_arr(image, window_size=7):
+    """
+    Mean local variance of an already-decoded grayscale image.
+
+    Parameters:
+        image (ndarray): uint8 grayscale image.
+        window_size (int): Size of the local window (must be odd).
+
+    Returns:
+        float: Mean local variance across the image.
+    """
+    # Compute local mean. boxFilter is a normalized box (mean) filter run as
+    # running sums, so its cost doesn't grow with the window size; it reads the
+    # uint8 image directly and writes float32.
+    window = (window_size, window_size)
+    local_mean = cv2.boxFilter(image, cv2.CV_32F, window)
 
-    # Compute local squared mean
-    local_sq_mean = cv2.filter2D(image ** 2, -1, kernel)
+    # Compute local squared mean (the squares are formed straight into float32)
+    local_sq_mean = cv2.boxFilter(cv2.multiply(image, image, dtype=cv2.CV_32F), -1, window)
 
-    # Local variance = E[X^2] - (E[X])^2
-    local_variance = local_sq_mean - local_mean ** 2
+    # Local variance = E[X^2] - (E[X])^2, computed in place
+    cv2.multiply(local_mean, local_mean, dst=local_mean)
+    local_variance = cv2.subtract(local_sq_mean, local_mean, dst=local_sq_mean)
 
     # Return the mean of local variances as a global sharpness indicator
-    return np.mean(local_variance)
+    return cv2.mean(local_variance)[0]
 
 # Example usage
 if __name__ == "__main__":
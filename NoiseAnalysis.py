@@ -1,8 +1,38 @@
 import sys
 import cv2
-import numpy as np
-from PIL import Image
-from image_utils import get_qc_image_path
+from image_utils import get_qc_image_path, load_image
+
+def calculate_noise_levels_arr(image):
+    """
+    Overall, luminance and chrominance noise of an already-decoded BGR image.
+
+    Args:
+        image (ndarray): uint8 BGR image.
+
+    Returns:
+        tuple: (laplacian_variance, luminance_noise, chrominance_noise)
+    """
+    # Convert to YCrCb (OpenCV's channel order: Y, Cr, Cb). Its Y channel is the
+    # same BT.601 luma as a grayscale conversion, so it doubles as the gray image.
+    ycrcb_image = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
+    gray_image = cv2.extractChannel(ycrcb_image, 0)
+
+    # Apply the Laplacian filter. Its output for an 8-bit image lies within
+    # +/-1020, so 16-bit integers hold it exactly at a quarter of float64's size.
+    laplacian_image = cv2.Laplacian(gray_image, cv2.CV_16S)
+
+    # Calculate the variance as a metric for overall noise (single pass)
+    _, laplacian_std = cv2.meanStdDev(laplacian_image)
+    overall_noise_metric = laplacian_std[0, 0] ** 2
+
+    # Noise for each channel based on standard deviation, all three in one pass
+    _, channel_std = cv2.meanStdDev(ycrcb_image)
+    y_noise, cr_noise, cb_noise = channel_std.ravel()
+
+    # Combined chrominance noise score
+    chroma_noise = (cb_noise + cr_noise) / 2
+
+    return overall_noise_metric, y_noise, chroma_noise
 
 def analyze_noise(image_path: str):
     """
@@ -15,47 +45,17 @@ def analyze_noise(image_path: str):
         # --- Overall Noise Analysis using OpenCV (Laplacian Filter) ---
         print("\n--- Overall Noise Analysis ---")
         
-        # Read the image using OpenCV
-        image = cv2.imread(image_path)
+        # Read the image once; both analyses work from this buffer
+        image = load_image(image_path)
         if image is None:
             raise FileNotFoundError(f"File not found or unable to read: {image_path}")
-            
-        # Convert to grayscale
-        gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply the Laplacian filter
-        laplacian_image = cv2.Laplacian(gray_image, cv2.CV_64F)
-        
-        # Calculate the variance as a metric for overall noise
-        overall_noise_metric = np.var(laplacian_image)
+
+        overall_noise_metric, y_noise, chroma_noise = calculate_noise_levels_arr(image)
         
         print(f"📈 Overall Noise Metric (Laplacian Variance): {overall_noise_metric:.2f}")
 
         # --- Advanced Noise Analysis (Luminance vs. Chrominance) ---
         print("\n--- Advanced Noise Analysis ---")
-
-        # Load the image again using Pillow to convert to YCbCr
-        pil_img = Image.open(image_path)
-        ycbcr_img = pil_img.convert('YCbCr')
-        ycbcr_array = np.array(ycbcr_img)
-
-        # Split the channels
-        y_channel = ycbcr_array[:,:,0]  # Luminance
-        cb_channel = ycbcr_array[:,:,1] # Chrominance (Blue-difference)
-        cr_channel = ycbcr_array[:,:,2] # Chrominance (Red-difference)
-        
-        # Simple function to calculate noise from a single channel's standard deviation
-        def calculate_std_noise(channel):
-            return np.std(channel)
-
-        # Calculate noise for each channel based on standard deviation
-        y_noise = calculate_std_noise(y_channel)
-        cb_noise = calculate_std_noise(cb_channel)
-        cr_noise = calculate_std_noise(cr_channel)
-        
-        # Combined chrominance noise score
-        chroma_noise = (cb_noise + cr_noise) / 2
-        
         print(f"📊 Luminance Noise (Y-channel): {y_noise:.2f}")
         print(f"🎨 Chrominance Noise (Cb/Cr-channels): {chroma_noise:.2f}")
 
@@ -77,6 +77,7 @@ if __name__ == "__main__":
     try:
         # Define the fixed image path
         image_file = get_qc_image_path()
-        analyze_noise(image_file)    except (FileNotFoundError, ValueError) as e:
+        analyze_noise(image_file)
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
\ No newline at end of file
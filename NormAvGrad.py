@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 import os
+from SobelEIS import calculate_sobel_edge_intensity_arr as _sobel_sum_arr
 
 def calculate_normalized_average_gradient(image_path):
     """
@@ -15,28 +16,27 @@ def calculate_normalized_average_gradient(image_path):
     Returns:
         float: The normalized average gradient score.
     """
-    if not os.path.exists(image_path):
-        raise FileNotFoundError(f"Error: The image file was not found at {image_path}")
-
-    # Load the image in grayscale
+    # Load the image in grayscale. imread returns None for a missing or
+    # unreadable file, so there is no separate existence check.
     image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
     if image is None:
-        raise ValueError("Error: Could not load the image. Check file integrity.")
+        raise FileNotFoundError(f"Error: Could not load the image at {image_path}. Check that it exists and is intact.")
 
-    # Convert to float for accurate gradient calculation
-    image = image.astype(np.float32)
+    return calculate_normalized_average_gradient_arr(image)
 
-    # Calculate horizontal and vertical gradients using the Sobel operator
-    # The gradients show the rate of change of pixel intensity.
-    grad_x = cv2.Sobel(image, cv2.CV_32F, 1, 0, ksize=3)
-    grad_y = cv2.Sobel(image, cv2.CV_32F, 0, 1, ksize=3)
+def calculate_normalized_average_gradient_arr(image):
+    """
+    Normalized average gradient of an already-decoded grayscale image.
 
-    # Calculate the gradient magnitude (total edge strength at each pixel)
-    # This is the Euclidean norm of the gradient vector at each pixel
-    grad_magnitude = np.sqrt(grad_x**2 + grad_y**2)
+    Parameters:
+        image (ndarray): uint8 grayscale image.
 
-    # Calculate the average of the gradient magnitudes
-    average_gradient = np.mean(grad_magnitude)
+    Returns:
+        float: The normalized average gradient score.
+    """
+    # Average of the 3x3 Sobel gradient magnitudes (the total edge strength at each
+    # pixel), from SobelEIS's fused single-pass sum
+    average_gradient = _sobel_sum_arr(image) / image.size
 
     # Normalize the score by dividing by the maximum possible value (255 * sqrt(2))
     # This scales the score to a range of 0 to 1, making it easier to compare
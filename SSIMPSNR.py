@@ -2,10 +2,54 @@
 
 import os
 import cv2
-from skimage.metrics import structural_similarity as ssim
-from skimage.metrics import peak_signal_noise_ratio as psnr
 from image_utils import get_qc_image_path
 
+# SSIM parameters, matching skimage.metrics.structural_similarity's defaults for 8-bit
+# images: a 7x7 uniform window with sample (N-1) covariance, K1=0.01, K2=0.03
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+def ssim(img1, img2):
+    """
+    Mean structural similarity of two 8-bit grayscale images, equal to
+    skimage.metrics.structural_similarity(img1, img2) to float32 precision.
+    The local moments come from separable box filters over float32 buffers, and
+    the map is combined in place, so only a handful of image-sized buffers exist.
+    """
+    window = (SSIM_WINDOW, SSIM_WINDOW)
+    cov_norm = SSIM_WINDOW ** 2 / (SSIM_WINDOW ** 2 - 1)
+    x = img1.astype('float32')
+    y = img2.astype('float32')
+
+    def local_mean(a):
+        # skimage's uniform_filter reflects the border ('reflect' == BORDER_REFLECT)
+        return cv2.boxFilter(a, -1, window, borderType=cv2.BORDER_REFLECT)
+
+    mu_x, mu_y = local_mean(x), local_mean(y)
+    mu_xy = cv2.multiply(mu_x, mu_y)
+    mu_x_sq = cv2.multiply(mu_x, mu_x, dst=mu_x)
+    mu_y_sq = cv2.multiply(mu_y, mu_y, dst=mu_y)
+
+    # Sample variances and covariance: cov_norm * (E[ab] - E[a]E[b])
+    var_x = cv2.subtract(local_mean(cv2.multiply(x, x)), mu_x_sq)
+    var_y = cv2.subtract(local_mean(cv2.multiply(y, y)), mu_y_sq)
+    cov_xy = cv2.subtract(local_mean(cv2.multiply(x, y, dst=x)), mu_xy, dst=y)
+
+    # ((2 mu_x mu_y + C1)(2 cov_xy + C2)) / ((mu_x^2 + mu_y^2 + C1)(var_x + var_y + C2)),
+    # each step written over a buffer that is no longer needed
+    a1 = cv2.add(cv2.multiply(mu_xy, 2.0, dst=mu_xy), SSIM_C1, dst=mu_xy)
+    a2 = cv2.add(cv2.multiply(cov_xy, 2.0 * cov_norm, dst=cov_xy), SSIM_C2, dst=cov_xy)
+    b1 = cv2.add(cv2.add(mu_x_sq, mu_y_sq, dst=mu_x_sq), SSIM_C1, dst=mu_x_sq)
+    b2 = cv2.add(cv2.multiply(cv2.add(var_x, var_y, dst=var_x), cov_norm, dst=var_x), SSIM_C2, dst=var_x)
+    numerator = cv2.multiply(a1, a2, dst=a1)
+    denominator = cv2.multiply(b1, b2, dst=b1)
+    ssim_map = cv2.divide(numerator, denominator, dst=numerator)
+
+    # Like skimage, average over the interior only, where the window fits
+    pad = (SSIM_WINDOW - 1) // 2
+    return cv2.mean(ssim_map[pad:-pad, pad:-pad])[0]
+
 def compare_with_reference(image_path, reference_path):
     img1 = cv2.imread(image_path)
     img2 = cv2.imread(reference_path)
@@ -17,7 +61,8 @@ def compare_with_reference(image_path, reference_path):
     img2_gray = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
 
     ssim_score = ssim(img1_gray, img2_gray)
-    psnr_score = psnr(img1_gray, img2_gray)
+    # PSNR with the 8-bit peak value of 255 in one pass
+    psnr_score = cv2.PSNR(img1_gray, img2_gray)
 
     print(f"🔍 SSIM: {ssim_score:.4f}")
     print(f"📶 PSNR: {psnr_score:.2f} dB")
@@ -10,7 +10,6 @@ required_packages = [
     "scikit-image",             # image metrics
     "Pillow",                   # image loading
     "pywt",                     # wavelet transforms (alias for PyWavelets)
-    "piexif",                   # EXIF metadata
     "ipython",                  # Jupyter/Colab support
     "jupyter",                  # Jupyter notebooks
     "notebook",                 # Jupyter notebook server
@@ -24,11 +23,27 @@ package_aliases = {
     "pywt": "PyWavelets"
 }
 
+def _pip_install(packages):
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "--prefer-binary", *packages])
+
 def install_packages(packages):
-    for package in packages:
-        actual_package = package_aliases.get(package, package)
+    actual_packages = [package_aliases.get(package, package) for package in packages]
+
+    # One pip run resolves the whole dependency set once and reuses its downloads,
+    # instead of starting pip and resolving from scratch for every package
+    try:
+        _pip_install(actual_packages)
+        for package in packages:
+            print(f"✅ {package} installed successfully.")
+        return
+    except subprocess.CalledProcessError:
+        print("⚠️ Batch installation failed; retrying packages one at a time.")
+
+    # Fall back to per-package installs so one bad package doesn't block the rest
+    # and the failure can be reported by name
+    for package, actual_package in zip(packages, actual_packages):
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", actual_package])
+            _pip_install([actual_package])
             print(f"✅ {package} installed successfully.")
         except subprocess.CalledProcessError:
             print(f"❌ Failed to install {package}.")
@@ -39,19 +39,22 @@ def to_gray_norm(img_norm):
 # --- Metrics ---
 def metric_laplacian(img_gray):
     img8 = (img_gray * 255).astype(np.uint8)
-    return cv2.Laplacian(img8, cv2.CV_64F).var()
+    _, std = cv2.meanStdDev(cv2.Laplacian(img8, cv2.CV_32F))
+    return float(std[0, 0]) ** 2
 
 def metric_tenengrad(img_gray):
     img8 = (img_gray * 255).astype(np.uint8)
-    gx = cv2.Sobel(img8, cv2.CV_64F, 1, 0)
-    gy = cv2.Sobel(img8, cv2.CV_64F, 0, 1)
-    return np.mean(gx**2 + gy**2)
+    gx = cv2.Sobel(img8, cv2.CV_32F, 1, 0)
+    gy = cv2.Sobel(img8, cv2.CV_32F, 0, 1)
+    # mean(gx^2 + gy^2) from the squared norms, with no squared or summed temporaries
+    return (cv2.norm(gx, cv2.NORM_L2SQR) + cv2.norm(gy, cv2.NORM_L2SQR)) / img8.size
 
 def metric_noise_luminance(img_gray):
     img8 = (img_gray * 255).astype(np.uint8)
     denoised = cv2.medianBlur(img8, 5)
-    noise = img8.astype(np.int16) - denoised.astype(np.int16)
-    return np.std(noise)
+    noise = cv2.subtract(img8, denoised, dtype=cv2.CV_16S)
+    _, std = cv2.meanStdDev(noise)
+    return float(std[0, 0])
 
 def metric_dynamic_range(img_gray):
     img8 = (img_gray * 255).astype(np.uint8)
@@ -1,19 +1,41 @@
 import cv2
 import numpy as np
 
+# Optional ahead-of-time compiled kernel, built from _sobel_pythran.py with Pythran
+try:
+    from _sobel_ext import tenengrad as _tenengrad_ext
+except ImportError:
+    _tenengrad_ext = None
+
+# Otherwise the Numba kernel from qc_kernels, when Numba is installed
+try:
+    from qc_kernels import tenengrad_sum as _tenengrad_kernel
+except ImportError:
+    _tenengrad_kernel = None
+
 def calculate_tenengrad_sharpness(image_path):
     # Load image in grayscale
     image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
     if image is None:
         raise FileNotFoundError(f"Image not found: {image_path}")
 
-    # Compute Sobel gradients
-    sobel_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
-    sobel_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
+    return calculate_tenengrad_sharpness_arr(image)
+
+def calculate_tenengrad_sharpness_arr(image):
+    # Tenengrad metric: sum of squared gradient magnitudes, Gx^2 + Gy^2
+    if _tenengrad_ext is not None:
+        # The compiled kernel only accepts C-contiguous arrays
+        return float(_tenengrad_ext(np.ascontiguousarray(image)))
+
+    if _tenengrad_kernel is not None:
+        # Sobel taps and the sum of squares fused into one pass over the uint8 image
+        return float(_tenengrad_kernel(image))
+
+    # Compute both Sobel gradients in one pass, as int16 (exact for uint8 input)
+    sobel_x, sobel_y = cv2.spatialGradient(image)
 
-    # Tenengrad metric: sum of squared gradient magnitudes
-    magnitude = np.sqrt(sobel_x**2 + sobel_y**2)
-    tenengrad_metric = np.sum(magnitude**2)
+    # Squared norms of the int16 gradients, accumulated in double precision by cv2.norm
+    tenengrad_metric = cv2.norm(sobel_x, cv2.NORM_L2SQR) + cv2.norm(sobel_y, cv2.NORM_L2SQR)
 
     return tenengrad_metric
 
@@ -1,7 +1,6 @@
 import sys
-from PIL import Image
-import numpy as np
-from image_utils import get_qc_image_path
+import cv2
+from image_utils import get_qc_image_path, load_image
 
 def analyze_vignetting(image_path):
     """
@@ -12,9 +11,11 @@ def analyze_vignetting(image_path):
         image_path (str): The path to the image file.
     """
     try:
-        # Load the image and convert it to grayscale
-        img = Image.open(image_path).convert('L')
-        img_array = np.array(img).astype(np.float32)
+        # Load the image straight to a uint8 grayscale array; only region means are
+        # needed, so there is no PIL intermediate or float32 copy
+        img_array = load_image(image_path, cv2.IMREAD_GRAYSCALE)
+        if img_array is None:
+            raise FileNotFoundError(f"File not found or unable to read: {image_path}")
 
         print(f"✅ Successfully loaded image: {image_path}")
         print("\n--- Vignetting Analysis ---")
@@ -31,19 +32,19 @@ def analyze_vignetting(image_path):
             width//2 - center_width//2 : width//2 + center_width//2
         ]
         
-        # Calculate the average brightness of the center
-        center_brightness = np.mean(center_region)
+        # Calculate the average brightness of the center (cv2.mean reduces the
+        # view in place, without copying the region)
+        center_brightness = cv2.mean(center_region)[0]
         
-        # Get the four corner regions
-        corners = np.concatenate([
-            img_array[:center_height, :center_width].flatten(),  # Top-left
-            img_array[:center_height, -center_width:].flatten(), # Top-right
-            img_array[-center_height:, :center_width].flatten(), # Bottom-left
-            img_array[-center_height:, -center_width:].flatten() # Bottom-right
-        ])
-        
-        # Calculate the average brightness of the corners
-        corners_brightness = np.mean(corners)
+        # Average brightness of the four corner regions. They are all the same size,
+        # so the mean of their means is the mean over all corner pixels, with no
+        # flattened copies or concatenation.
+        corners_brightness = (
+            cv2.mean(img_array[:center_height, :center_width])[0]      # Top-left
+            + cv2.mean(img_array[:center_height, -center_width:])[0]   # Top-right
+            + cv2.mean(img_array[-center_height:, :center_width])[0]   # Bottom-left
+            + cv2.mean(img_array[-center_height:, -center_width:])[0]  # Bottom-right
+        ) / 4.0
 
         # Calculate the light falloff as a percentage
         if center_brightness == 0:
@@ -74,6 +75,7 @@ if __name__ == "__main__":
     try:
         # Define the fixed image path
         image_file = get_qc_image_path()
-        analyze_vignetting(image_file)    except (FileNotFoundError, ValueError) as e:
+        analyze_vignetting(image_file)
+    except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")
\ No newline at end of file
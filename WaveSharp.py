@@ -4,13 +4,21 @@
 # using a wavelet-based method. The method measures the energy of the
 # high-frequency detail coefficients, with higher energy indicating sharper details.
 #
-# You may need to install the PyWavelets library: pip install PyWavelets
+# The single-level 'db1' (Haar) transform is computed directly, so PyWavelets
+# is not needed.
 
 import cv2
 import numpy as np
-import pywt
 import os
-import glob
+import multiprocessing
+from image_utils import IMAGE_EXTENSIONS
+
+# The Haar energy comes from a Numba kernel in qc_kernels when Numba is installed,
+# and from OpenCV filters otherwise
+try:
+    from qc_kernels import haar_detail_energy as _haar_detail_energy
+except ImportError:
+    _haar_detail_energy = None
 
 def calculate_wavelet_sharpness(image_path):
     """
@@ -25,7 +33,6 @@ def calculate_wavelet_sharpness(image_path):
     
     Raises:
         FileNotFoundError: If the specified image file does not exist.
-        ImportError: If the pywt library is not installed.
     """
     try:
         image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
@@ -38,42 +45,66 @@ def calculate_wavelet_sharpness(image_path):
                 print(f"Warning: Could not read image file {os.path.basename(image_path)}. Skipping.")
                 return None
 
-        # Convert image to float32 for wavelet transform
-        image_float = np.float32(image)
+        if _haar_detail_energy is not None:
+            # Haar detail energy in one pass over the uint8 image
+            return float(_haar_detail_energy(image))
+
+        # Pad an odd last row or column with a copy of itself (pywt.dwt2's symmetric
+        # mode), so every pixel belongs to a 2x2 block
+        rows, cols = image.shape
+        if rows % 2 or cols % 2:
+            image = cv2.copyMakeBorder(image, 0, rows % 2, 0, cols % 2, cv2.BORDER_REFLECT)
 
-        # Perform 2D discrete wavelet transform on the image
-        # 'db1' is the Daubechies wavelet of order 1.
-        coeffs = pywt.dwt2(image_float, 'db1')
-        cA, (cH, cV, cD) = coeffs
+        # The Haar coefficients of each 2x2 block are orthonormal, so the detail
+        # energy cH^2 + cV^2 + cD^2 is the block's sum of squares minus cA^2, where
+        # cA is half the block sum. The block sums come from one separable 2x2 box
+        # filter (the Haar low-pass along rows and columns) sampled at even pixels.
+        block_sums = cv2.boxFilter(image, cv2.CV_32F, (2, 2), anchor=(0, 0), normalize=False)[::2, ::2]
 
-        # Calculate the energy of the high-frequency components
-        sharpness_score = np.sum(np.square(cH)) + np.sum(np.square(cV)) + np.sum(np.square(cD))
+        # Sums of squares accumulated in double by cv2.norm, with no float copy of
+        # the image and no subband arrays
+        sharpness_score = cv2.norm(image, cv2.NORM_L2SQR) - cv2.norm(block_sums, cv2.NORM_L2SQR) / 4
 
         return sharpness_score
 
-    except ImportError:
-        print("The 'pywt' library is not installed. Please install it with: pip install PyWavelets")
-        return None
     except Exception as e:
         print(f"An unexpected error occurred while processing {os.path.basename(image_path)}: {e}")
         return None
 
+def _process_one(img_path):
+    """
+    Worker for the batch run. calculate_wavelet_sharpness reports its own errors
+    and returns None, so one bad file doesn't stop the pool.
+    """
+    return img_path, calculate_wavelet_sharpness(img_path)
+
 if __name__ == "__main__":
     # Define the directory where your images are located
     image_directory = "QCImages"
     
-    # Get a list of all image files (jpg and png) in the specified directory
-    image_files = glob.glob(os.path.join(image_directory, "*.jpg")) + glob.glob(os.path.join(image_directory, "*.png"))
+    # Get a list of all image files (TIFF, PNG and JPEG, any case) in the specified
+    # directory from a single scan; DirEntry caches the file type, so there is no
+    # extra stat per entry
+    image_files = []
+    if os.path.isdir(image_directory):
+        with os.scandir(image_directory) as entries:
+            image_files = [entry.path for entry in entries
+                           if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)]
     
     if not image_files:
         print(f"No image files found in the '{image_directory}' directory.")
     else:
         print(f"Found {len(image_files)} image(s) to analyze.")
         print("---")
-        for img_path in image_files:
-            file_name = os.path.basename(img_path)
-            sharpness_score = calculate_wavelet_sharpness(img_path)
-            if sharpness_score is not None:
+
+        # Each image is independent, so score them on all cores. Workers are spawned
+        # rather than forked: forking after the Numba kernel's thread pool has
+        # started can deadlock the children.
+        with multiprocessing.get_context("spawn").Pool() as pool:
+            for img_path, sharpness_score in pool.imap_unordered(_process_one, image_files, chunksize=4):
+                file_name = os.path.basename(img_path)
+                if sharpness_score is None:
+                    continue
                 print(f"Image: {file_name}")
                 print(f"  Wavelet Sharpness Score = {sharpness_score:.2f}")
                 print("---")
@@ -0,0 +1,11 @@
+# Pythran source for the Brenner kernel used by BrennerQC.py. Optional build,
+# run from the repository root (produces _brenner_ext.*.so next to it):
+#     $ pythran -DUSE_XSIMD -march=native _brenner_pythran.py -o _brenner_ext.so
+# The diff, square and sum fuse into one SIMD loop with no temporary arrays.
+
+#pythran export brenner(uint8[:,:])
+import numpy as np
+
+def brenner(image):
+    d = image[:-2].astype(np.int64) - image[2:].astype(np.int64)
+    return (d * d).sum()
@@ -0,0 +1,38 @@
+# Pythran source for the colorfulness and histogram kernels used by color_utils.py.
+# Optional build, run from the repository root (produces _color_ext.*.so next to it):
+#     $ pythran -DUSE_XSIMD -fopenmp -march=native -O3 -DNDEBUG _color_pythran.py -o _color_ext.so
+# Same single-pass algorithms as the Numba kernels in qc_kernels.py. The extension
+# loads without Numba or a JIT step, so color_utils prefers it when it is built.
+
+#pythran export colorfulness_moments(uint8[:,:,:])
+#pythran export luminance_histogram(uint8[:,:])
+import numpy as np
+
+def colorfulness_moments(image):
+    # Sums and sums of squares of rg = R - G and 2 * yb = R + G - 2B, in integers
+    height, width = image.shape[0], image.shape[1]
+    s_rg = 0
+    s_rg2 = 0
+    s_yb = 0
+    s_yb2 = 0
+    #omp parallel for reduction(+:s_rg, s_rg2, s_yb, s_yb2)
+    for i in range(height):
+        for j in range(width):
+            b = np.int64(image[i, j, 0])
+            g = np.int64(image[i, j, 1])
+            r = np.int64(image[i, j, 2])
+            rg = r - g
+            yb = r + g - 2 * b
+            s_rg += rg
+            s_rg2 += rg * rg
+            s_yb += yb
+            s_yb2 += yb * yb
+    return s_rg, s_rg2, s_yb, s_yb2
+
+def luminance_histogram(image):
+    height, width = image.shape
+    histogram = np.zeros(256, dtype=np.int64)
+    for i in range(height):
+        for j in range(width):
+            histogram[image[i, j]] += 1
+    return histogram
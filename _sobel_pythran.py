@@ -0,0 +1,76 @@
+# Pythran source for the 3x3 Sobel reductions used by SobelEIS.py and TenengradQC.py.
+# Optional build, run from the repository root (produces _sobel_ext.*.so next to it):
+#     $ pythran -DUSE_XSIMD -fopenmp -march=native -O3 -DNDEBUG -ffast-math _sobel_pythran.py -o _sobel_ext.so
+# Same algorithm as the Numba kernels: per-row vertical partial sums, then the
+# horizontal taps and the reduction in one loop with no derivative images. Rows
+# are split into chunks of ROWS_PER_CHUNK spread across threads with OpenMP; each
+# chunk allocates its smooth/diff scratch rows once and reuses them for all its
+# rows. The inner loops are plain int32 arithmetic that the C++ compiler
+# vectorizes for the target's SIMD width.
+
+#pythran export sobel_sum(uint8[:,:])
+#pythran export tenengrad(uint8[:,:])
+import numpy as np
+
+ROWS_PER_CHUNK = 64
+
+def _row_partial_sums(image, i, smooth, diff):
+    # [1, 2, 1] vertical smoothing (for Gx) and [-1, 0, 1] vertical difference
+    # (for Gy) of row i, with borders reflected as in cv2.Sobel
+    height, width = image.shape
+    up = abs(i - 1) if height > 1 else 0
+    down = i + 1 if i + 1 < height else max(height - 2, 0)
+    for j in range(width):
+        a = np.int32(image[up, j])
+        c = np.int32(image[down, j])
+        smooth[j] = a + 2 * np.int32(image[i, j]) + c
+        diff[j] = c - a
+
+def sobel_sum(image):
+    height, width = image.shape
+    n_chunks = (height + ROWS_PER_CHUNK - 1) // ROWS_PER_CHUNK
+    # At the edge columns the reflected neighbours coincide: Gx = 0
+    edge = 1 if width > 1 else 0
+    total = 0.0
+    #omp parallel for reduction(+:total)
+    for c in range(n_chunks):
+        smooth = np.empty(width, dtype=np.int32)
+        diff = np.empty(width, dtype=np.int32)
+        chunk_sum = 0.0
+        for i in range(c * ROWS_PER_CHUNK, min((c + 1) * ROWS_PER_CHUNK, height)):
+            _row_partial_sums(image, i, smooth, diff)
+            row_sum = 2.0 * abs(diff[edge] + diff[0])
+            for j in range(1, width - 1):
+                gx = smooth[j + 1] - smooth[j - 1]
+                gy = diff[j - 1] + 2 * diff[j] + diff[j + 1]
+                row_sum += np.sqrt(float(gx * gx + gy * gy))
+            if width > 1:
+                row_sum += 2.0 * abs(diff[width - 2] + diff[width - 1])
+            chunk_sum += row_sum
+        total += chunk_sum
+    return total
+
+def tenengrad(image):
+    height, width = image.shape
+    n_chunks = (height + ROWS_PER_CHUNK - 1) // ROWS_PER_CHUNK
+    edge = 1 if width > 1 else 0
+    total = 0
+    #omp parallel for reduction(+:total)
+    for c in range(n_chunks):
+        smooth = np.empty(width, dtype=np.int32)
+        diff = np.empty(width, dtype=np.int32)
+        chunk_sum = np.int64(0)
+        for i in range(c * ROWS_PER_CHUNK, min((c + 1) * ROWS_PER_CHUNK, height)):
+            _row_partial_sums(image, i, smooth, diff)
+            gy = 2 * (diff[edge] + diff[0])
+            row_sum = np.int64(gy * gy)
+            for j in range(1, width - 1):
+                gx = smooth[j + 1] - smooth[j - 1]
+                gy = diff[j - 1] + 2 * diff[j] + diff[j + 1]
+                row_sum += gx * gx + gy * gy
+            if width > 1:
+                gy = 2 * (diff[width - 2] + diff[width - 1])
+                row_sum += gy * gy
+            chunk_sum += row_sum
+        total += chunk_sum
+    return total
@@ -5,9 +5,44 @@ Automatically validates all PhotoQC scripts for import issues, syntax errors, an
 """
 
 import ast
+import functools
 import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+@functools.lru_cache(maxsize=None)
+def _module_available(name):
+    """
+    Whether a top-level module can be found, without importing it: find_spec only
+    asks the import finders, so heavy packages like torch or cv2 aren't executed.
+    Cached, since most scripts share the same imports.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def _catches_import_error(handler):
+    """Whether an except clause catches ImportError (bare, by name, or in a tuple)"""
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(isinstance(t, ast.Name) and t.id in ("ImportError", "ModuleNotFoundError") for t in types)
+
+def _optional_imports(tree):
+    """
+    Import statements inside a `try` whose handler catches ImportError: optional
+    dependencies (compiled extensions, Numba, GPU backends) that the module
+    already falls back from when they are missing.
+    """
+    optional = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Try) and any(_catches_import_error(h) for h in node.handlers):
+            for stmt in node.body:
+                optional.update(sub for sub in ast.walk(stmt) if isinstance(sub, (ast.Import, ast.ImportFrom)))
+    return optional
+
 class PhotoQCValidator:
     def __init__(self, project_path="."):
         self.project_path = Path(project_path)
@@ -16,28 +51,33 @@ class PhotoQCValidator:
         self.warnings = []
         self.success_count = 0
         
-    def validate_syntax(self, file_path):
-        """Check Python syntax"""
+    def read_source(self, file_path):
+        """Read and parse a file once; returns (source, tree, error)"""
+        try:
+            source = file_path.read_text(encoding='utf-8')
+        except Exception as e:
+            return None, None, f"Read error: {e}"
+        tree, error = self.validate_syntax(source)
+        return source, tree, error
+    
+    def validate_syntax(self, source):
+        """Check Python syntax; returns (tree, None) or (None, error)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-            ast.parse(source)
-            return True, None
+            return ast.parse(source), None
         except SyntaxError as e:
-            return False, f"Syntax error: {e}"
+            return None, f"Syntax error: {e}"
         except Exception as e:
-            return False, f"Parse error: {e}"
+            return None, f"Parse error: {e}"
     
-    def validate_imports(self, file_path):
-        """Check if all imports are available"""
+    def validate_imports(self, tree):
+        """Check if all required imports are available (optional ones are skipped)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-            
-            tree = ast.parse(source)
             imports = []
+            optional = _optional_imports(tree)
             
             for node in ast.walk(tree):
+                if node in optional:
+                    continue
                 if isinstance(node, ast.Import):
                     for alias in node.names:
                         imports.append(alias.name)
@@ -52,8 +92,8 @@ class PhotoQCValidator:
                         # Special case for our utility
                         if not (self.project_path / "image_utils.py").exists():
                             missing.append(imp)
-                    else:
-                        importlib.import_module(imp.split('.')[0])
+                    elif not _module_available(imp.split('.')[0]):
+                        missing.append(imp)
                 except ImportError:
                     missing.append(imp)
             
@@ -62,12 +102,9 @@ class PhotoQCValidator:
         except Exception as e:
             return False, [f"Import check failed: {e}"]
     
-    def check_image_utils_integration(self, file_path):
+    def check_image_utils_integration(self, file_path, content):
         """Check if script properly uses image_utils"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # Skip utility files and setup files
             if file_path.name in ['image_utils.py', 'SetUpReqs.py', 'batch_update_images.py']:
                 return True, "Utility file - skip check"
@@ -91,41 +128,57 @@ class PhotoQCValidator:
         except Exception as e:
             return False, f"Integration check failed: {e}"
     
+    def validate_file(self, py_file):
+        """
+        Run every check on one file. Returns the report lines plus the errors and
+        warnings found, so files can be checked in worker processes and reported
+        in order by the parent.
+        """
+        result = {"lines": [f"\n📄 Validating {py_file.name}..."], "errors": [], "warnings": [], "success": False}
+        lines = result["lines"]
+        
+        # Read and parse the file once; every check below works from these
+        source, tree, syntax_error = self.read_source(py_file)
+        if tree is None:
+            result["errors"].append(f"{py_file.name}: {syntax_error}")
+            lines.append(f"  ❌ Syntax: {syntax_error}")
+            return result
+        lines.append("  ✅ Syntax: OK")
+        
+        # Import check
+        imports_ok, missing_imports = self.validate_imports(tree)
+        if not imports_ok:
+            result["warnings"].append(f"{py_file.name}: Missing imports: {missing_imports}")
+            lines.append(f"  ⚠️  Imports: Missing {missing_imports}")
+        else:
+            lines.append("  ✅ Imports: OK")
+        
+        # Image utils integration check
+        integration_ok, integration_msg = self.check_image_utils_integration(py_file, source)
+        if not integration_ok:
+            result["warnings"].append(f"{py_file.name}: {integration_msg}")
+            lines.append(f"  ⚠️  Integration: {integration_msg}")
+        else:
+            lines.append(f"  ✅ Integration: {integration_msg}")
+        
+        result["success"] = imports_ok and integration_ok
+        return result
+    
     def run_validation(self):
         """Run full validation suite"""
         print("🔍 PhotoQC Auto-Validator Starting...")
         print("=" * 50)
         
-        for py_file in self.python_files:
-            print(f"\n📄 Validating {py_file.name}...")
-            
-            # Syntax check
-            syntax_ok, syntax_error = self.validate_syntax(py_file)
-            if not syntax_ok:
-                self.errors.append(f"{py_file.name}: {syntax_error}")
-                print(f"  ❌ Syntax: {syntax_error}")
-                continue
-            else:
-                print("  ✅ Syntax: OK")
-            
-            # Import check
-            imports_ok, missing_imports = self.validate_imports(py_file)
-            if not imports_ok:
-                self.warnings.append(f"{py_file.name}: Missing imports: {missing_imports}")
-                print(f"  ⚠️  Imports: Missing {missing_imports}")
-            else:
-                print("  ✅ Imports: OK")
-            
-            # Image utils integration check
-            integration_ok, integration_msg = self.check_image_utils_integration(py_file)
-            if not integration_ok:
-                self.warnings.append(f"{py_file.name}: {integration_msg}")
-                print(f"  ⚠️  Integration: {integration_msg}")
-            else:
-                print(f"  ✅ Integration: {integration_msg}")
-            
-            if syntax_ok and imports_ok and integration_ok:
-                self.success_count += 1
+        # Files are independent, so check them in parallel. Workers are spawned, as
+        # in the batch scripts, and map() hands the results back in file order.
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as executor:
+            for result in executor.map(self.validate_file, self.python_files):
+                for line in result["lines"]:
+                    print(line)
+                self.errors.extend(result["errors"])
+                self.warnings.extend(result["warnings"])
+                if result["success"]:
+                    self.success_count += 1
         
         self.print_summary()
     
@@ -4,6 +4,7 @@ Batch update script to replace hardcoded image paths with dynamic image loading
 across all PhotoQC scripts.
 """
 
+import ast
 import os
 import re
 
@@ -31,6 +32,70 @@ files_to_update = [
     "Vignetting.py"
 ]
 
+# Hardcoded image paths and their dynamic-loading replacements, compiled once
+PATH_PATTERNS = [(re.compile(pattern), replacement) for pattern, replacement in [
+    # Pattern 1: image_file = os.path.join(os.getcwd(), "QCImages", "QCRef.jpg")
+    (r'image_file\s*=\s*os\.path\.join\(os\.getcwd\(\),\s*["\']QCImages["\']\s*,\s*["\']QCRef\.jpg["\']\)',
+     'image_file = get_qc_image_path()'),
+    
+    # Pattern 2: image_file = "QCImages/QCRef.jpg" 
+    (r'image_file\s*=\s*["\']QCImages/QCRef\.jpg["\']',
+     'image_file = get_qc_image_path()'),
+    
+    # Pattern 3: image_path = "QCImages/QCRef.jpg"
+    (r'image_path\s*=\s*["\']QCImages/QCRef\.jpg["\']',
+     'image_path = get_qc_image_path()'),
+    
+    # Pattern 4: file_name = "QCRef.jpg" (when used with QCImages)
+    (r'file_name\s*=\s*["\']QCRef\.jpg["\']',
+     'image_path = get_qc_image_path()'),
+    
+    # Pattern 5: img_path = "/workspaces/PhotoQC/QCImages/QCRef.jpg"
+    (r'img_path\s*=\s*["\'][^"\']*QCImages[^"\']*QCRef\.jpg["\']',
+     'img_path = get_qc_image_path()'),
+    
+    # Pattern 6: image_path = os.path.join("QCImages", "QCRef2.jpg")
+    (r'image_path\s*=\s*os\.path\.join\(["\']QCImages["\']\s*,\s*["\']QCRef2\.jpg["\']\)',
+     'image_path = get_qc_image_path()'),
+]]
+
+MAIN_EXCEPT = [
+    '    except (FileNotFoundError, ValueError) as e:',
+    '        print(f"Error: {e}")',
+    '        print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")',
+]
+
+def _is_main_guard(node):
+    """Whether an AST node is `if __name__ == "__main__":`"""
+    test = node.test if isinstance(node, ast.If) else None
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+            and test.left.id == "__name__" and len(test.comparators) == 1
+            and isinstance(test.comparators[0], ast.Constant)
+            and test.comparators[0].value == "__main__")
+
+def wrap_main_block(content):
+    """
+    Wraps the body of the `if __name__ == "__main__":` block in a try/except for
+    missing or invalid images. The block is located with the AST, so its extent is
+    exact and found in one pass; the lines themselves are re-indented as text, which
+    keeps comments and formatting intact.
+    """
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return content
+
+    main = next((node for node in tree.body if _is_main_guard(node)), None)
+    # Leave blocks that already handle errors alone
+    if main is None or any(isinstance(node, ast.Try) for node in main.body):
+        return content
+
+    lines = content.split('\n')
+    # Everything after the `if` line, comments included, moves into the try
+    start, end = main.lineno, main.end_lineno
+    body = ['    ' + line if line.strip() else line for line in lines[start:end]]
+    return '\n'.join(lines[:start] + ['    try:'] + body + MAIN_EXCEPT + lines[end:])
+
 def update_file(filepath):
     """Update a single file to use dynamic image loading"""
     if not os.path.exists(filepath):
@@ -67,57 +132,11 @@ def update_file(filepath):
             content = '\n'.join(new_lines)
         
         # Replace hardcoded image paths with dynamic loading
-        patterns = [
-            # Pattern 1: image_file = os.path.join(os.getcwd(), "QCImages", "QCRef.jpg")
-            (r'image_file\s*=\s*os\.path\.join\(os\.getcwd\(\),\s*["\']QCImages["\']\s*,\s*["\']QCRef\.jpg["\']\)',
-             'image_file = get_qc_image_path()'),
-            
-            # Pattern 2: image_file = "QCImages/QCRef.jpg" 
-            (r'image_file\s*=\s*["\']QCImages/QCRef\.jpg["\']',
-             'image_file = get_qc_image_path()'),
-            
-            # Pattern 3: image_path = "QCImages/QCRef.jpg"
-            (r'image_path\s*=\s*["\']QCImages/QCRef\.jpg["\']',
-             'image_path = get_qc_image_path()'),
-            
-            # Pattern 4: file_name = "QCRef.jpg" (when used with QCImages)
-            (r'file_name\s*=\s*["\']QCRef\.jpg["\']',
-             'image_path = get_qc_image_path()'),
-            
-            # Pattern 5: img_path = "/workspaces/PhotoQC/QCImages/QCRef.jpg"
-            (r'img_path\s*=\s*["\'][^"\']*QCImages[^"\']*QCRef\.jpg["\']',
-             'img_path = get_qc_image_path()'),
-            
-            # Pattern 6: image_path = os.path.join("QCImages", "QCRef2.jpg")
-            (r'image_path\s*=\s*os\.path\.join\(["\']QCImages["\']\s*,\s*["\']QCRef2\.jpg["\']\)',
-             'image_path = get_qc_image_path()'),
-        ]
-        
-        for pattern, replacement in patterns:
-            content = re.sub(pattern, replacement, content)
+        for pattern, replacement in PATH_PATTERNS:
+            content = pattern.sub(replacement, content)
         
-        # Add error handling to main sections
-        if 'if __name__ == "__main__"' in content:
-            # Replace simple main sections with try-except blocks
-            main_pattern = r'if __name__ == "__main__":\s*\n((?:\s{4}.*\n?)*)'
-            
-            def replace_main(match):
-                main_content = match.group(1)
-                # Don't wrap if already has try-except
-                if 'try:' in main_content and 'except' in main_content:
-                    return match.group(0)
-                
-                # Add try-except wrapper
-                indented_content = '\n'.join(['    ' + line if line.strip() else line 
-                                            for line in main_content.split('\n')])
-                
-                return f'''if __name__ == "__main__":
-    try:
-{indented_content}    except (FileNotFoundError, ValueError) as e:
-        print(f"Error: {{e}}")
-        print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")'''
-            
-            content = re.sub(main_pattern, replace_main, content, flags=re.MULTILINE)
+        # Add error handling to the main section
+        content = wrap_main_block(content)
         
         # Write updated content
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -0,0 +1,173 @@
+import cv2
+import numpy as np
+
+# sRGB (D65) to CIE XYZ conversion matrix
+SRGB_TO_XYZ = np.array([
+    [0.412424, 0.357579, 0.180464],
+    [0.212656, 0.715158, 0.072186],
+    [0.0193324, 0.119193, 0.950444]
+])
+
+# D65 reference white point in XYZ
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# CIE constants for the XYZ -> Lab conversion
+CIE_EPSILON = 216 / 24389
+CIE_KAPPA = 24389 / 27
+
+def srgb_to_lab(rgb):
+    """
+    Converts sRGB values to CIELAB (D65), matching colormath's
+    convert_color(sRGBColor, LabColor). Works on a single color or a whole image.
+
+    Args:
+        rgb (array-like): sRGB values in the range [0, 1], with channels on the last axis.
+
+    Returns:
+        ndarray: CIELAB values (L, a, b) on the last axis, same leading shape as the input.
+    """
+    rgb = np.asarray(rgb, dtype=np.float64)
+
+    # Undo the sRGB gamma curve to get linear light
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+    # Linear RGB -> XYZ, normalized by the reference white
+    xyz = np.einsum('ij,...j->...i', SRGB_TO_XYZ, linear) / D65_WHITE
+
+    # XYZ -> Lab
+    f = np.where(xyz > CIE_EPSILON, np.cbrt(xyz), (CIE_KAPPA * xyz + 16) / 116)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+    return np.stack([116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+def delta_e_cie2000(lab1, lab2, kl=1, kc=1, kh=1):
+    """
+    Calculates the CIEDE2000 color difference, following Sharma et al.'s reference
+    equations. Vectorized, so it can compare a single color or whole Lab images.
+
+    Args:
+        lab1 (array-like): First CIELAB color(s), with (L, a, b) on the last axis.
+        lab2 (array-like): Second CIELAB color(s), broadcastable against lab1.
+        kl, kc, kh (float): Parametric weighting factors for lightness, chroma and hue.
+
+    Returns:
+        ndarray: Delta E 2000 value(s); a 0-d array for single colors.
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    # Adjust a* to compensate for the chroma dependency of hue near the neutral axis
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - np.sqrt(C_bar ** 7 / (C_bar ** 7 + 25.0 ** 7)))
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_product = C1p * C2p
+
+    # Differences in lightness, chroma and hue
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, dhp)
+    dhp = np.where(dhp < -180, dhp + 360, dhp)
+    dhp = np.where(chroma_product == 0, 0, dhp)
+    dHp = 2 * np.sqrt(chroma_product) * np.sin(np.radians(dhp / 2))
+
+    # Means of lightness, chroma and hue
+    Lbp = (L1 + L2) / 2
+    Cbp = (C1p + C2p) / 2
+    h_sum = h1p + h2p
+    hbp = np.where(np.abs(h1p - h2p) <= 180, h_sum / 2,
+                   np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    hbp = np.where(chroma_product == 0, h_sum, hbp)
+
+    T = (1
+         - 0.17 * np.cos(np.radians(hbp - 30))
+         + 0.24 * np.cos(np.radians(2 * hbp))
+         + 0.32 * np.cos(np.radians(3 * hbp + 6))
+         - 0.20 * np.cos(np.radians(4 * hbp - 63)))
+
+    # Weighting functions and the blue-region rotation term
+    delta_theta = 30 * np.exp(-((hbp - 275) / 25) ** 2)
+    Rc = 2 * np.sqrt(Cbp ** 7 / (Cbp ** 7 + 25.0 ** 7))
+    Sl = 1 + (0.015 * (Lbp - 50) ** 2) / np.sqrt(20 + (Lbp - 50) ** 2)
+    Sc = 1 + 0.045 * Cbp
+    Sh = 1 + 0.015 * Cbp * T
+    Rt = -np.sin(np.radians(2 * delta_theta)) * Rc
+
+    dL_term = dLp / (kl * Sl)
+    dC_term = dCp / (kc * Sc)
+    dH_term = dHp / (kh * Sh)
+    return np.sqrt(dL_term ** 2 + dC_term ** 2 + dH_term ** 2 + Rt * dC_term * dH_term)
+
+# Optional ahead-of-time compiled kernels, built from _color_pythran.py with Pythran.
+# They load instantly and need neither Numba nor a JIT step, so they take priority.
+try:
+    import _color_ext
+except ImportError:
+    _color_ext = None
+
+# Otherwise the Numba kernels from qc_kernels for the colorfulness moments and the
+# luminance histogram; NumPy fallbacks below
+qc_kernels = None
+if _color_ext is None:
+    try:
+        import qc_kernels
+        from numba import get_num_threads
+    except ImportError:
+        qc_kernels = None
+
+def colorfulness(image):
+    """
+    Hasler and Suesstrunk colorfulness metric of a uint8 BGR image.
+
+    Args:
+        image (ndarray): uint8 BGR image.
+
+    Returns:
+        float: The colorfulness score. A higher value indicates a more colorful image.
+    """
+    if _color_ext is not None or qc_kernels is not None:
+        n = image.shape[0] * image.shape[1]
+        if _color_ext is not None:
+            # The compiled kernel only accepts C-contiguous arrays
+            s_rg, s_rg2, s_yb, s_yb2 = _color_ext.colorfulness_moments(np.ascontiguousarray(image))
+        else:
+            s_rg, s_rg2, s_yb, s_yb2 = qc_kernels.colorfulness_moments(image)
+        mean_rg = s_rg / n
+        mean_yb = s_yb / (2 * n)
+        var_rg = max(s_rg2 / n - mean_rg ** 2, 0.0)
+        var_yb = max(s_yb2 / (4 * n) - mean_yb ** 2, 0.0)
+        return float(np.sqrt(var_rg + var_yb) + 0.3 * np.sqrt(mean_rg ** 2 + mean_yb ** 2))
+
+    # Opponent color channels in float32, without splitting the whole image first
+    B = image[..., 0].astype(np.float32)
+    G = image[..., 1].astype(np.float32)
+    R = image[..., 2].astype(np.float32)
+    rg = R - G
+    yb = 0.5 * (R + G) - B
+    mean_rg, std_rg = (v.item() for v in cv2.meanStdDev(rg))
+    mean_yb, std_yb = (v.item() for v in cv2.meanStdDev(yb))
+    return float(np.sqrt(std_rg ** 2 + std_yb ** 2) + 0.3 * np.sqrt(mean_rg ** 2 + mean_yb ** 2))
+
+def luminance_histogram(image):
+    """
+    256-bin histogram of a uint8 grayscale image, computed in a single (parallel)
+    pass. histogram[0] and histogram[255] are the clipped shadow and highlight counts.
+
+    Args:
+        image (ndarray): uint8 grayscale image.
+
+    Returns:
+        ndarray: int64 pixel counts for each value 0-255.
+    """
+    if _color_ext is not None:
+        return _color_ext.luminance_histogram(np.ascontiguousarray(image))
+    if qc_kernels is not None:
+        return qc_kernels.luminance_histogram(image, get_num_threads())
+    return np.bincount(image.ravel(), minlength=256)
@@ -52,14 +52,14 @@ def rms_tenengrad(img: np.ndarray) -> float:
     s  = (img * 255.0).clip(0, 255).astype(np.uint8)
     sx = cv2.Sobel(s, cv2.CV_64F, 1, 0, ksize=3)
     sy = cv2.Sobel(s, cv2.CV_64F, 0, 1, ksize=3)
-    return float(np.sqrt(np.mean(sx ** 2 + sy ** 2)))
+    return float(np.sqrt((cv2.norm(sx, cv2.NORM_L2SQR) + cv2.norm(sy, cv2.NORM_L2SQR)) / s.size))
 
 
 def rms_laplacian(img: np.ndarray) -> float:
     """RMS Laplacian - second-order gradient, normalized by pixel count.
     uint8 input required -- OpenCV 4.12.0 AVX2 rejects float32->CV_64F."""
     s = (img * 255.0).clip(0, 255).astype(np.uint8)
-    return float(np.sqrt(np.mean(cv2.Laplacian(s, cv2.CV_64F) ** 2)))
+    return float(cv2.norm(cv2.Laplacian(s, cv2.CV_64F), cv2.NORM_L2) / np.sqrt(s.size))
 
 
 def compute_all(path: Path) -> dict:
@@ -0,0 +1,239 @@
+# qc_kernels.py
+#
+# Numba kernels shared by the metric scripts, kept in one place so every importer
+# uses the same compiled code. Nothing is compiled when this module is imported:
+# each kernel is compiled on its first call, and cache=True stores the machine
+# code on disk so later runs (and spawned workers) load it instead of recompiling.
+#
+# Importing this module raises ImportError when Numba is not installed; the
+# metric modules catch that and use their OpenCV/NumPy paths instead.
+
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+@njit(parallel=True, fastmath=True, cache=True)
+def brenner_sum(image):
+    """Single-pass Brenner sum over rows in parallel, with no temporaries."""
+    height, width = image.shape
+    total = 0
+    for i in prange(height - 2):
+        row_sum = 0
+        for j in range(width):
+            d = np.int64(image[i, j]) - np.int64(image[i + 2, j])
+            row_sum += d * d
+        total += row_sum
+    return total
+
+@njit(fastmath=True, cache=True)
+def _sobel_row_partial_sums(image, i, smooth, diff):
+    """
+    Vertical partial sums of row i for the 3x3 Sobel kernels: the [1, 2, 1]
+    smoothing (for Gx) into smooth and the [-1, 0, 1] difference (for Gy) into
+    diff. Neighbouring output pixels share these, so the horizontal taps are 7 adds
+    per pixel instead of 15. Borders are reflected without repeating the edge
+    pixel, as in cv2.Sobel. This is the row step shared by sobel_sum and
+    tenengrad_sum; each applies its own reduction to the result.
+    """
+    height, width = image.shape
+    up = abs(i - 1) if height > 1 else 0
+    down = i + 1 if i + 1 < height else max(height - 2, 0)
+    for j in range(width):
+        a = np.int32(image[up, j])
+        c = np.int32(image[down, j])
+        smooth[j] = a + 2 * np.int32(image[i, j]) + c
+        diff[j] = c - a
+
+# In both reductions, horizontal differences of the smoothed sums give Gx and
+# horizontal smoothing of the differences gives Gy. At the two edge columns the
+# reflected neighbours coincide, so Gx is 0 and Gy = 2 * (diff[j] + diff[nb]).
+# The rows are split into one chunk per thread, and each chunk reuses its own row
+# of the smooth/diff scratch buffers, so a call makes two allocations in all
+# rather than two per image row. The chunk count is an argument (the thread count,
+# passed by the wrappers below) because a kernel that asks for it can't be cached.
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _sobel_sum(image, n_chunks):
+    """
+    Sum of the 3x3 Sobel gradient magnitudes of a uint8 image in a single pass
+    over rows in parallel, with no derivative or magnitude images stored.
+    """
+    height, width = image.shape
+    n_chunks = max(1, min(n_chunks, height))
+    rows_per_chunk = (height + n_chunks - 1) // n_chunks
+    smooth_rows = np.empty((n_chunks, width), dtype=np.int32)
+    diff_rows = np.empty((n_chunks, width), dtype=np.int32)
+    edge = 1 if width > 1 else 0
+    total = 0.0
+    for c in prange(n_chunks):
+        smooth = smooth_rows[c]
+        diff = diff_rows[c]
+        chunk_sum = 0.0
+        for i in range(c * rows_per_chunk, min((c + 1) * rows_per_chunk, height)):
+            _sobel_row_partial_sums(image, i, smooth, diff)
+            row_sum = 2.0 * abs(diff[edge] + diff[0])
+            for j in range(1, width - 1):
+                gx = smooth[j + 1] - smooth[j - 1]
+                gy = diff[j - 1] + 2 * diff[j] + diff[j + 1]
+                row_sum += np.sqrt(np.float64(gx * gx + gy * gy))
+            if width > 1:
+                row_sum += 2.0 * abs(diff[width - 2] + diff[width - 1])
+            chunk_sum += row_sum
+        total += chunk_sum
+    return total
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _tenengrad_sum(image, n_chunks):
+    """
+    Sum of Gx^2 + Gy^2 over the 3x3 Sobel derivatives of a uint8 image in a single
+    pass over rows in parallel, with no derivative images stored. Integer math, so
+    the sum is exact.
+    """
+    height, width = image.shape
+    n_chunks = max(1, min(n_chunks, height))
+    rows_per_chunk = (height + n_chunks - 1) // n_chunks
+    smooth_rows = np.empty((n_chunks, width), dtype=np.int32)
+    diff_rows = np.empty((n_chunks, width), dtype=np.int32)
+    edge = 1 if width > 1 else 0
+    total = 0
+    for c in prange(n_chunks):
+        smooth = smooth_rows[c]
+        diff = diff_rows[c]
+        chunk_sum = 0
+        for i in range(c * rows_per_chunk, min((c + 1) * rows_per_chunk, height)):
+            _sobel_row_partial_sums(image, i, smooth, diff)
+            gy = 2 * (diff[edge] + diff[0])
+            row_sum = np.int64(gy * gy)
+            for j in range(1, width - 1):
+                gx = smooth[j + 1] - smooth[j - 1]
+                gy = diff[j - 1] + 2 * diff[j] + diff[j + 1]
+                row_sum += gx * gx + gy * gy
+            if width > 1:
+                gy = 2 * (diff[width - 2] + diff[width - 1])
+                row_sum += gy * gy
+            chunk_sum += row_sum
+        total += chunk_sum
+    return total
+
+def sobel_sum(image):
+    """Sum of the 3x3 Sobel gradient magnitudes of a uint8 image."""
+    return _sobel_sum(image, get_num_threads())
+
+def tenengrad_sum(image):
+    """Sum of Gx^2 + Gy^2 over the 3x3 Sobel derivatives of a uint8 image (exact)."""
+    return _tenengrad_sum(image, get_num_threads())
+
+@njit(parallel=True, fastmath=True, cache=True)
+def gradient_moments(image):
+    """
+    One pass over the image computing, per pixel, the 4-neighbour Laplacian and
+    the 3x3 Sobel derivatives (reflect-101 borders, as cv2.Laplacian/cv2.Sobel),
+    and accumulating the sums the Laplacian variance and Sobel metrics need.
+    """
+    height, width = image.shape
+    pixel_sum = 0
+    lap_sum = 0
+    lap_sq_sum = 0
+    grad_sq_sum = 0
+    mag_sum = 0.0
+    for i in prange(height):
+        iu = i - 1 if i > 0 else min(1, height - 1)
+        idn = i + 1 if i < height - 1 else max(height - 2, 0)
+        row_pixels = 0
+        row_lap = 0
+        row_lap_sq = 0
+        row_grad_sq = 0
+        row_mag = 0.0
+        for j in range(width):
+            jl = j - 1 if j > 0 else min(1, width - 1)
+            jr = j + 1 if j < width - 1 else max(width - 2, 0)
+            c = np.int64(image[i, j])
+            u = np.int64(image[iu, j])
+            d = np.int64(image[idn, j])
+            l = np.int64(image[i, jl])
+            r = np.int64(image[i, jr])
+            ul = np.int64(image[iu, jl])
+            ur = np.int64(image[iu, jr])
+            dl = np.int64(image[idn, jl])
+            dr = np.int64(image[idn, jr])
+            lap = u + d + l + r - 4 * c
+            sx = (ur + 2 * r + dr) - (ul + 2 * l + dl)
+            sy = (dl + 2 * d + dr) - (ul + 2 * u + ur)
+            grad_sq = sx * sx + sy * sy
+            row_pixels += c
+            row_lap += lap
+            row_lap_sq += lap * lap
+            row_grad_sq += grad_sq
+            row_mag += np.sqrt(np.float64(grad_sq))
+        pixel_sum += row_pixels
+        lap_sum += row_lap
+        lap_sq_sum += row_lap_sq
+        grad_sq_sum += row_grad_sq
+        mag_sum += row_mag
+    return pixel_sum, lap_sum, lap_sq_sum, grad_sq_sum, mag_sum
+
+@njit(parallel=True, fastmath=True, cache=True)
+def haar_detail_energy(image):
+    """
+    Energy of the single-level 'db1' (Haar) detail coefficients cH, cV and cD of a
+    uint8 image, straight from its 2x2 blocks with no float copy or subbands.
+    For a block a, b, c, d the four Haar coefficients are orthonormal, so
+    cH^2 + cV^2 + cD^2 = (a^2 + b^2 + c^2 + d^2) - cA^2 with cA = (a+b+c+d) / 2;
+    four times that is accumulated in integers, so the sum is exact. An odd last
+    row or column is paired with itself, as pywt.dwt2's default symmetric mode does.
+    """
+    height, width = image.shape
+    total = 0
+    for bi in prange((height + 1) // 2):
+        r0 = 2 * bi
+        r1 = min(r0 + 1, height - 1)
+        row_sum = 0
+        for bj in range((width + 1) // 2):
+            c0 = 2 * bj
+            c1 = min(c0 + 1, width - 1)
+            a = np.int64(image[r0, c0])
+            b = np.int64(image[r0, c1])
+            c = np.int64(image[r1, c0])
+            d = np.int64(image[r1, c1])
+            s = a + b + c + d
+            row_sum += 4 * (a * a + b * b + c * c + d * d) - s * s
+        total += row_sum
+    return total / 4
+
+@njit(parallel=True, fastmath=True, cache=True)
+def colorfulness_moments(image):
+    """
+    Single pass over a uint8 BGR image accumulating the sums and sums of squares
+    of rg = R - G and 2 * yb = R + G - 2B. Integer math, so the sums are exact.
+    """
+    height, width = image.shape[:2]
+    s_rg = 0
+    s_rg2 = 0
+    s_yb = 0
+    s_yb2 = 0
+    for i in prange(height):
+        for j in range(width):
+            b = np.int64(image[i, j, 0])
+            g = np.int64(image[i, j, 1])
+            r = np.int64(image[i, j, 2])
+            rg = r - g
+            yb = r + g - 2 * b
+            s_rg += rg
+            s_rg2 += rg * rg
+            s_yb += yb
+            s_yb2 += yb * yb
+    return s_rg, s_rg2, s_yb, s_yb2
+
+@njit(parallel=True, cache=True)
+def luminance_histogram(image, n_chunks):
+    """
+    256-bin histogram of a uint8 grayscale image. Each chunk of rows counts into
+    its own histogram (no shared writes between threads), then they are summed.
+    """
+    height, width = image.shape
+    partial = np.zeros((n_chunks, 256), dtype=np.int64)
+    rows_per_chunk = (height + n_chunks - 1) // n_chunks
+    for c in prange(n_chunks):
+        for i in range(c * rows_per_chunk, min((c + 1) * rows_per_chunk, height)):
+            for j in range(width):
+                partial[c, image[i, j]] += 1
+    return partial.sum(axis=0)
@@ -0,0 +1,126 @@
+# qc_run.py
+#
+# Runs the core QC metrics on an image in one process with a single decode.
+# The image is read once and its grayscale and RGB versions are shared by
+# every metric, instead of each script re-reading the same file. The metrics
+# are independent, so they run concurrently on a thread pool: OpenCV and NumPy
+# release the GIL in their kernels, and threads share the decoded buffers
+# without copying them.
+#
+# Usage:
+#     python qc_run.py [image] [--metrics noise,grad,lens] [--reference ref.jpg]
+# With no image, the QC image in QCImages is used. SSIM and PSNR need --reference.
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from BlindDeconRL import estimate_blur_with_richardson_lucy_arr
+from BrennerQC import calculate_brenner_sharpness_arr
+from Brisque import calculate_brisque_score_arr
+from CannyECS import count_canny_edges_arr
+from ChromaticAberration import analyze_chromatic_aberration_arr
+from ColorAccuracy import analyze_color_accuracy_and_white_balance_arr
+from LensDistortion import calculate_lens_distortion_arr
+from LocalVar import compute_local_variance_arr
+from NoiseAnalysis import calculate_noise_levels_arr
+from NormAvGrad import calculate_normalized_average_gradient_arr
+from SSIMPSNR import ssim
+from image_utils import get_qc_image_path, load_image
+
+# Metric name -> (result key, function, names of the shared buffers it takes)
+METRICS = {
+    "brenner": ("brenner_sharpness", calculate_brenner_sharpness_arr, ("gray",)),
+    "canny": ("canny_edge_count", count_canny_edges_arr, ("gray",)),
+    "rl_blur": ("richardson_lucy_blur", estimate_blur_with_richardson_lucy_arr, ("gray",)),
+    "chromatic": ("chromatic_aberration_score", analyze_chromatic_aberration_arr, ("bgr", "gray")),
+    "delta_e": ("delta_e", analyze_color_accuracy_and_white_balance_arr, ("rgb",)),
+    "brisque": ("brisque_score", calculate_brisque_score_arr, ("rgb",)),
+    "noise": ("noise_levels", calculate_noise_levels_arr, ("bgr",)),
+    "variance": ("local_variance", compute_local_variance_arr, ("gray",)),
+    "grad": ("normalized_avg_gradient", calculate_normalized_average_gradient_arr, ("gray",)),
+    "lens": ("lens_distortion", calculate_lens_distortion_arr, ("gray",)),
+    "ssim": ("ssim", ssim, ("gray", "reference")),
+    "psnr": ("psnr", cv2.PSNR, ("gray", "reference")),
+}
+ALL_METRICS = list(METRICS)
+# Metrics backed by parallel Numba kernels, which aren't sent to the pool (see qc_pipeline)
+NUMBA_METRICS = {"brenner", "grad"}
+REFERENCE_METRICS = {"ssim", "psnr"}
+
+def qc_pipeline(image_path, metrics=None, reference_path=None):
+    """
+    Decodes an image once and runs the selected metrics on the shared buffers,
+    concurrently.
+
+    Parameters:
+        image_path (str): Path to the image file.
+        metrics (list): Metric names from ALL_METRICS; defaults to every metric
+            that can run (SSIM and PSNR only when a reference is given).
+        reference_path (str): Optional reference image for SSIM and PSNR.
+
+    Returns:
+        dict: Metric name to value.
+    """
+    if metrics is None:
+        metrics = [m for m in ALL_METRICS if reference_path or m not in REFERENCE_METRICS]
+    unknown = set(metrics) - set(ALL_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(ALL_METRICS)}")
+    if REFERENCE_METRICS & set(metrics) and not reference_path:
+        raise ValueError("SSIM and PSNR need a reference image (--reference).")
+
+    # Decode once, then derive every representation the metrics need
+    bgr = load_image(image_path, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise FileNotFoundError(f"File not found or unable to read: {image_path}")
+    print(f"✅ Successfully loaded image: {image_path}")
+
+    buffers = {"bgr": bgr, "gray": cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY),
+               "rgb": cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)}
+    if reference_path:
+        buffers["reference"] = load_image(reference_path, cv2.IMREAD_GRAYSCALE)
+        if buffers["reference"] is None:
+            raise FileNotFoundError(f"File not found or unable to read: {reference_path}")
+
+    tasks = [METRICS[m] for m in metrics if m not in NUMBA_METRICS]
+    numba_tasks = [METRICS[m] for m in metrics if m in NUMBA_METRICS]
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(len(tasks), os.cpu_count() or 1))) as pool:
+        futures = [(key, pool.submit(fn, *(buffers[b] for b in inputs))) for key, fn, inputs in tasks]
+
+        # The Numba kernels run here on the calling thread, one after the other,
+        # while the pool works: depending on the threading layer, Numba's parallel
+        # kernels may not be entered from several threads at once
+        for key, fn, inputs in numba_tasks:
+            results[key] = fn(*(buffers[b] for b in inputs))
+
+        for key, future in futures:
+            results[key] = future.result()
+
+    # Report the noise analysis as its three components
+    if "noise_levels" in results:
+        (results["laplacian_noise"], results["luminance_noise"],
+         results["chrominance_noise"]) = results.pop("noise_levels")
+
+    print("\n--- QC Pipeline Report ---")
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the core QC metrics on one image with a single decode.")
+    parser.add_argument("image", nargs="?", help="Image to analyze (default: the image in QCImages)")
+    parser.add_argument("--metrics", help=f"Comma-separated subset of: {','.join(ALL_METRICS)}")
+    parser.add_argument("--reference", help="Reference image for SSIM and PSNR")
+    args = parser.parse_args()
+
+    try:
+        image_file = args.image or get_qc_image_path()
+        selected = [m.strip() for m in args.metrics.split(",") if m.strip()] if args.metrics else None
+        qc_pipeline(image_file, selected, args.reference)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        print("Please place a valid image file (TIFF, PNG, or JPEG) in the QCImages folder.")